@@ -2,14 +2,24 @@
 #[x-cmds]: UPDATE
 """Lists all Python files, executable as commands, in the current directory.
 A short description and command arguments are displayed if available."""
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import TypedDict, Optional, Literal, cast
+from typing import TypedDict, Optional, Iterable, Literal, cast
 from xulbux.base.types import ArgParseConfigs
 from xulbux.console import Spinner
 from xulbux.regex import LazyRegex
-from xulbux import FormatCodes, Console, FileSys, String, System, Regex
+from xulbux import FormatCodes, Console, FileSys, System
+from requests.adapters import HTTPAdapter
 import requests
+import tempfile
+import shutil
+import tokenize
+import shlex
 import hashlib
+import ast
+import io
+import json
+import time
 import os
 import re
 
@@ -35,57 +45,269 @@ CONFIG = {
     "command_dir": FileSys.script_dir,  # MUST BE A `pathlib.Path` OBJECT
     "github_updates" : {
         "github_repo_urls": ["https://github.com/XulbuX/Python/tree/main/Projects/Commands"],
+        "github_api_url": "https://api.github.com",  # CAN BE POINTED AT A LOCAL STAND-IN SERVER FOR TESTING
+        "max_connections": 8,  # HOW MANY LISTINGS AND DOWNLOADS ARE FETCHED AT ONCE
         "check_for_new_commands": True,
         "check_for_command_updates": True,
     },
 }
 
-ARGS = Console.get_args({"update_check": {"-u", "--update"}})
+INDEX_PATH = Path(
+    os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+) / "x-cmds" / "index.json"
+INDEX_VERSION = 3  # BUMP THIS WHENEVER THE STORED METADATA OR THE WAY IT'S PARSED CHANGES, SO OLD ENTRIES AREN'T REUSED
+INDEX_RACY_NS = 2_000_000_000  # FILES MODIFIED THIS SHORTLY BEFORE COULD STILL CHANGE WITHIN THE SAME MTIME
+LISTINGS_PATH = INDEX_PATH.parent / "listings.json"  # THE LAST GITHUB DIRECTORY LISTINGS WITH THEIR ETAGS
+STAGING_PREFIX = ".x-cmds-staging-"  # DOWNLOADS ARE STAGED IN A DIRECTORY INSIDE THE COMMAND DIRECTORY, SO THEY CAN BE MOVED IN ATOMICALLY
+BACKUP_DIR_NAME = ".x-cmds-backup"  # THE PREVIOUS VERSIONS OF THE FILES CHANGED BY THE LAST UPDATE, TO ROLL IT BACK
+COMPLETIONS_PATH = INDEX_PATH.parent / "completions.tsv"  # ONE `NAME<TAB>FLAG:KEY FLAG:KEY …<TAB>DESCRIPTION` LINE PER COMMAND
+
+ARGS = Console.get_args({
+    "update_check": {"-u", "--update"},
+    "rollback": {"-r", "--rollback"},
+    "completion": {"-c", "--completion"},
+})
 
 PATTERNS = LazyRegex(
     python_shebang=r"(?i)^\s*#!.*python",
     update_marker=r"(?i)^\s*#\s*\[x-cmds\]\s*:\s*UPDATE\s*$",
     desc=r"(?is)^(?:\s*#!?[^\n]+)*\s*(\"{3}(?:(?!\"\"\").)+\"{3}|'{3}(?:(?!''').)+'{3})",
+    get_args_call=r"Console\s*\.\s*get_args\s*\(",
     sys_argv=r"(?m)sys\s*\.\s*argv(?:\[[-:0-9]+\])?(?:\s*#\s*(\[.+?\]))?",
     args_comment=r"(\w+)(?:\s*:\s*(?:\{([^\}]*)\}|(before|after)))?",
-    get_args=r"(?m)Console\s*\.\s*get_args\s*\(\s*(?:[\w]+\s*=\s*(['\"])[^\1]+\1\s*(?:,\s*)?)?(?:arg_parse_configs\s*=\s*)?" + Regex.brackets("{", "}", is_group=True) + r"(?:\s*(?:,\s*)?(?:[\w]+\s*=\s*)?(['\"])[^\3]+\3)?\s*\)",
-    arg=r"""\s*(['"])(\w+)\1\s*:\s*(.*)\s*,?""",
 )
 
 
-def is_python_file(filepath: str) -> bool:
-    """Check if a file is a Python file by looking for shebang line."""
-    try:
-        with open(filepath, "r", encoding="utf-8") as file:
-            return bool(PATTERNS.python_shebang.match(file.readline()))
-    except Exception:
-        return False
+# THE SHELL COMPLETION SCRIPTS ONLY READ THE COMPLETION INDEX (`__INDEX__` IS REPLACED WITH ITS QUOTED PATH),
+# SO COMPLETING DOESN'T START PYTHON OR PARSE ANY COMMAND FILES
+COMPLETION_SCRIPTS = {
+    "bash": r"""
+_x_cmds_complete() {
+    local name flags desc flag cur="${COMP_WORDS[COMP_CWORD]}" words=()
+    [[ "$cur" == -* ]] || return  # LET BASH COMPLETE FILE NAMES
+    while IFS=$'\t' read -r name flags desc; do
+        [[ "$name" == "${COMP_WORDS[0]##*/}" ]] || continue
+        for flag in $flags; do words+=("${flag%%:*}"); done
+        COMPREPLY=($(compgen -W "${words[*]}" -- "$cur"))
+        return
+    done < __INDEX__
+}
+if [[ -r __INDEX__ ]]; then
+    while IFS=$'\t' read -r name _; do complete -o default -F _x_cmds_complete "$name"; done < __INDEX__
+fi
+""",
+    "zsh": r"""
+_x_cmds_complete() {
+    local name flags desc
+    local -a specs
+    if [[ "$PREFIX" == -* ]]; then
+        while IFS=$'\t' read -r name flags desc; do
+            [[ "$name" == "${words[1]:t}" ]] || continue
+            specs=(${=flags})
+            _describe -t options "${desc:-option}" specs
+            return
+        done < __INDEX__
+    fi
+    _files
+}
+if [[ -r __INDEX__ ]]; then
+    compdef _x_cmds_complete ${${(f)"$(<__INDEX__)"}%%$'\t'*}
+fi
+""",
+    "fish": r"""
+function __x_cmds_complete
+    string match --quiet -- '-*' (commandline --current-token); or return  # LET FISH COMPLETE FILE NAMES
+    set --local cmd (string replace --regex '.*/' '' -- (commandline --tokenize --cut-at-cursor --current-process)[1])
+    while read --delimiter \t name flags desc
+        test "$name" = "$cmd"; or continue
+        for spec in (string split --no-empty ' ' -- $flags)
+            string replace ':' \t -- $spec  # FISH TAKES "FLAG<TAB>DESCRIPTION" LINES
+        end
+        return
+    end < __INDEX__
+end
+if test -r __INDEX__
+    while read --delimiter \t name flags desc
+        complete --command $name --arguments '(__x_cmds_complete)'
+    end < __INDEX__
+end
+""",
+}
+
+class CommandMeta(TypedDict):
+    size: int
+    mtime_ns: int
+    is_command: bool
+    update_check: bool
+    blob_sha: Optional[str]
+    desc: Optional[str]
+    arg_parse_configs: Optional[ArgParseConfigs]
 
 
-def get_python_files() -> set[str]:
+def get_xcmds_options(lines: Iterable[str]) -> dict[str, bool]:
+    """Get options for `x-cmds` set using special `#[x-cmds]: …` comments."""
+    options: dict[str, bool] = {}
+    for line in lines:
+        if PATTERNS.python_shebang.match(line):
+            continue  # SKIP SHEBANG LINE
+        elif PATTERNS.update_marker.match(line):
+            options["update_check"] = True
+        else:
+            break  # STOP AT FIRST NON-MATCHING LINE
+    return options
+
+
+def get_blob_sha(content: str) -> str:
+    """Get the SHA-1 hash GitHub lists for a file with this content."""
+    # GITHUB USES: "blob " + FILESIZE + "\0" + CONTENT THEN SHA1 HASH
+    encoded = content.encode("utf-8")
+    return hashlib.sha1(f"blob {len(encoded)}\0".encode() + encoded).hexdigest()
+
+
+def read_command_meta(file_path: Path, size: int, mtime_ns: int) -> CommandMeta:
+    """Read a file once and parse everything that's shown about it as a command,
+    as well as its git blob SHA, if it's checked for updates.
+    Only the first line is read from files that don't start with a python shebang line."""
+    meta: CommandMeta = {
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "is_command": False,
+        "update_check": False,
+        "blob_sha": None,
+        "desc": None,
+        "arg_parse_configs": None,
+    }
+    try:
+        # (READ AS TEXT, WHICH NORMALIZES THE LINE ENDINGS TO LF LIKE IN THE GIT BLOB GITHUB HASHES)
+        with open(file_path, "r", encoding="utf-8") as file:
+            if not PATTERNS.python_shebang.match(first_line := file.readline()):
+                return meta
+            content = first_line + file.read()
+    except Exception:
+        return meta
+
+    meta["is_command"] = True
+    if get_xcmds_options(io.StringIO(content)).get("update_check"):
+        meta["update_check"] = True
+        meta["blob_sha"] = get_blob_sha(content)
+    if desc := PATTERNS.desc.match(content):
+        meta["desc"] = desc.group(1).strip("\n\"'")
+    meta["arg_parse_configs"] = parse_args(content)
+    return meta
+
+
+class CommandIndex:
+    """A JSON index of the metadata of all files in the command directory, keyed by their path and stat signature
+    (size, mtime), so listing the commands only has to read and parse the files that changed since the last run."""
+
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self.entries: dict[str, CommandMeta] = {}
+        self.seen_paths: set[str] = set()
+        self.racy_paths: set[str] = set()
+        self.changed = False
+        self.scan_start_ns = time.time_ns()
+        try:
+            with open(index_path, "r", encoding="utf-8") as file:
+                if (index := json.load(file)).get("version") == INDEX_VERSION:
+                    self.entries = index["files"]
+        except Exception:
+            pass  # A MISSING OR BROKEN INDEX IS JUST REBUILT
+
+    def get(self, file_path: Path) -> CommandMeta:
+        """Get the metadata of a file from the index, or read it again if the file changed since it was indexed."""
+        stat = file_path.stat()
+        self.seen_paths.add(key := str(file_path))
+        if (entry := self.entries.get(key)) and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry
+        self.entries[key] = meta = read_command_meta(file_path, stat.st_size, stat.st_mtime_ns)
+        if stat.st_mtime_ns >= self.scan_start_ns - INDEX_RACY_NS:
+            self.racy_paths.add(key)
+        self.changed = True
+        return meta
+
+    def save(self) -> None:
+        """Store the index, without the files in the command directory that weren't found anymore
+        and without the files that were modified too shortly before to be sure they're unchanged next time."""
+        command_dir = str(CONFIG["command_dir"])
+        stored = {
+            key: entry for key, entry in self.entries.items()
+            if key not in self.racy_paths and (key in self.seen_paths or os.path.dirname(key) != command_dir)
+        }
+        if not self.changed and len(stored) == len(self.entries):
+            return
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                # (FLAG SETS ARE STORED AS LISTS, WHICH ARE SHOWN THE SAME WAY)
+                json.dump(
+                    {"version": INDEX_VERSION, "files": stored}, file,
+                    default=lambda obj: list(obj) if isinstance(obj, (set, frozenset)) else repr(obj),
+                )
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            pass  # THE INDEX IS ONLY A CACHE, SO LISTING THE COMMANDS SHOULDN'T FAIL BECAUSE OF IT
+        self.changed = False
+
+
+def get_python_files(index: CommandIndex) -> set[str]:
     """Get all Python files in the command directory by checking shebang lines."""
     python_files = set()
     for file_path in CONFIG["command_dir"].iterdir():
-        if file_path.is_file() and is_python_file(str(file_path)):
-            python_files.add(file_path.name)
+        try:
+            if file_path.is_file() and index.get(file_path)["is_command"]:
+                python_files.add(file_path.name)
+        except OSError:
+            pass  # SKIP FILES THAT VANISHED OR CAN'T BE ACCESSED
     return python_files
 
 
-def get_xcmds_options(filepath: str) -> dict[str, bool]:
-    """Get options for `x-cmds` set using special `#[x-cmds]: …` comments."""
-    options: dict[str, bool] = {}
+def get_flags(arg_parse_configs: Optional[ArgParseConfigs]) -> list[tuple[str, str]]:
+    """Get all flags of a command's arguments, each with the key of the argument it belongs to."""
+    flags: list[tuple[str, str]] = []
+    for key, val in (arg_parse_configs or {}).items():
+        if isinstance(val, dict) and "flags" in val.keys():
+            val = val["flags"]
+        if isinstance(val, (list, tuple, set, frozenset)):
+            flags.extend((flag, key) for flag in sort_flags(list(val)))
+    return flags
+
+
+def save_completion_index(index: CommandIndex, python_files: set[str]) -> None:
+    """Write the completion index from the (cached) command metadata, which the shell completion scripts read.
+    It's only written if it changed, so the shells' completions are only touched when commands were changed."""
+    lines = []
+    for file in sorted(python_files):
+        meta = index.get(CONFIG["command_dir"] / file)
+        flags = " ".join(
+            f"{flag}:{key}" for flag, key in get_flags(meta["arg_parse_configs"])
+            if not any(char.isspace() or char == ":" for char in flag)
+        )
+        desc = " ".join((meta["desc"] or "").split("\n", 1)[0].split())
+        lines.append(f"{Path(file).stem}\t{flags}\t{desc}\n")
+
     try:
-        with open(filepath, "r", encoding="utf-8") as file:
-            for line in file:
-                if PATTERNS.python_shebang.match(line):
-                    continue  # SKIP SHEBANG LINE
-                elif PATTERNS.update_marker.match(line):
-                    options["update_check"] = True
-                else:
-                    break  # STOP AT FIRST NON-MATCHING LINE
+        with open(COMPLETIONS_PATH, "r", encoding="utf-8", newline="\n") as file:
+            if file.read() == "".join(lines):
+                return
     except Exception:
         pass
-    return options
+
+    try:
+        COMPLETIONS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = COMPLETIONS_PATH.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as file:
+            file.write("".join(lines))
+        os.replace(tmp_path, COMPLETIONS_PATH)
+    except Exception:
+        pass  # SHELL COMPLETION JUST KEEPS USING THE LAST INDEX
+
+
+def get_completion_script(shell: str) -> str:
+    if shell not in COMPLETION_SCRIPTS:
+        raise ValueError(f"Completion scripts are only available for {', '.join(COMPLETION_SCRIPTS)}, not '{shell}'.")
+    return COMPLETION_SCRIPTS[shell].replace("__INDEX__", shlex.quote(str(COMPLETIONS_PATH))).lstrip("\n")
 
 
 def sort_flags(flags: list[str]) -> list[str]:
@@ -116,15 +338,18 @@ def arguments_desc(arg_parse_configs: Optional[ArgParseConfigs]) -> str:
         else:
             arg_descs.append(repr(val))
 
-    opt_descs = ["[_c], [br:blue]".join(d) for d in arg_descs if isinstance(d, (list, tuple, set, frozenset))]
+    opt_flags = [d for d in arg_descs if isinstance(d, (list, tuple, set, frozenset))]
+    opt_descs = ["[_c], [br:blue]".join(d) for d in opt_flags]
     opt_keys = [keys.pop(i - j) for j, (i, _) in enumerate((i, d) for i, d in enumerate(arg_descs) if isinstance(d, (list, tuple, set, frozenset)))]
 
     arg_descs = [d for d in arg_descs if isinstance(d, str)]
     arg_keys = [f"<{keys[i]}>" for i, _ in enumerate(arg_descs)]
 
-    left_part_len = max(len(FormatCodes.remove(x)) for x in opt_descs + arg_keys)
+    # (THE VISIBLE WIDTH OF THE FLAGS IS KNOWN WITHOUT REMOVING THE FORMATTING AGAIN)
+    opt_widths = [len(", ".join(flags)) for flags in opt_flags]
+    left_part_len = max(opt_widths + [len(x) for x in arg_keys])
 
-    opt_len_diff = [len(d) - len(FormatCodes.remove(d)) for d in opt_descs]
+    opt_len_diff = [len(d) - opt_widths[i] for i, d in enumerate(opt_descs)]
     opt_descs = [
         f"[br:blue]({d:<{left_part_len + opt_len_diff[i]}})"
         f"    [blue]({FormatCodes.escape(f'[{opt_keys[i]}]')})"
@@ -160,56 +385,107 @@ def parse_args_comment(comment_str: str) -> ArgParseConfigs:
     return result
 
 
-def get_commands_str(python_files: set[str]) -> str:
+def read_statement(content: str, start: int) -> str:
+    """Read the whole logical line (statement) that starts at the line beginning at index `start`."""
+    lines: list[str] = []
+    readline = io.StringIO(content[start:]).readline
+
+    def read_line() -> str:
+        lines.append(line := readline())
+        return line
+
+    for token in tokenize.generate_tokens(read_line):
+        if token.type in {tokenize.NEWLINE, tokenize.ENDMARKER}:
+            break
+    return "".join(lines)
+
+
+def find_args_configs(tree: ast.Module) -> Optional[ArgParseConfigs]:
+    """Get the literal config of the first `Console.get_args()` call with a non-empty config in a syntax tree."""
+    for statement in tree.body:
+        for node in ast.walk(statement):
+            if not (
+                isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "get_args"
+                and isinstance(node.func.value, ast.Name) and node.func.value.id == "Console"
+            ):
+                continue
+            config = node.args[0] if node.args else next((kw.value for kw in node.keywords if kw.arg == "arg_parse_configs"), None)
+            if not isinstance(config, ast.Dict) or not config.keys:
+                continue
+
+            arg_parse_configs: ArgParseConfigs = {}
+            for key, val in zip(config.keys, config.values):
+                try:
+                    arg_parse_configs[ast.literal_eval(cast(ast.expr, key))] = ast.literal_eval(val)
+                except Exception:
+                    pass  # SKIP `**` UNPACKINGS AND VALUES THAT AREN'T LITERALS
+            return arg_parse_configs
+    return None
+
+
+def get_args_configs(content: str) -> Optional[ArgParseConfigs]:
+    """Get the `arg_parse_configs` of the first `Console.get_args()` call with a non-empty config.
+    Only the statement around each call is parsed, and the whole file only if none of them could be parsed on its own.
+    Returns `None` if there's no such call."""
+    parse_whole_file = False
+
+    for match in PATTERNS.get_args_call.finditer(content):
+        line_start = content.rfind("\n", 0, match.start()) + 1
+        try:
+            statement = read_statement(content, line_start)
+            # (AN INDENTED STATEMENT FROM INSIDE A BLOCK IS PARSED AS THE BODY OF A DUMMY BLOCK)
+            tree = ast.parse(f"if 1:\n{statement}" if statement[:1].isspace() else statement)
+        except (SyntaxError, ValueError, tokenize.TokenError):
+            # THE MATCH IS INSIDE A STRING OR COMMENT, OR THE STATEMENT STARTS ON AN EARLIER LINE
+            parse_whole_file = True
+            continue
+        if (arg_parse_configs := find_args_configs(tree)) is not None:
+            return arg_parse_configs
+
+    if parse_whole_file:
+        try:
+            return find_args_configs(ast.parse(content))
+        except (SyntaxError, ValueError):
+            pass
+    return None
+
+
+def parse_args(content: str) -> Optional[ArgParseConfigs]:
+    """Parse the arguments a command takes from its `Console.get_args()` call or its `sys.argv` comments.
+    Returns `None` if neither is found."""
+    if (arg_parse_configs := get_args_configs(content)) is not None:
+        return arg_parse_configs
+
+    if len(sys_argv_comments := PATTERNS.sys_argv.findall(content)) > 0:
+        # PARSE FIRST NON-EMPTY ARGS-DESCRIBING COMMENT
+        arg_parse_configs = {}
+        for comment in sys_argv_comments:
+            if (comment := comment.strip()).startswith("["):
+                arg_parse_configs.update(parse_args_comment(comment))
+        return arg_parse_configs
+
+    return None
+
+
+def get_commands_str(python_files: set[str], index: CommandIndex) -> str:
     i, cmds = 0, ""
 
     for i, file in enumerate(sorted(python_files), 1):
-        print("\n\n")
         cmd_name = Path(file).stem
         cmd_title_len = len(str(i)) + len(cmd_name) + 4
         cmds += f"\n[b|br:white|bg:br:white]([[black]{i}[br:white]][in|black]( {cmd_name} [bg:black]{'━' * (Console.w - cmd_title_len)}))"
 
-        sys_argv_comments, get_args_funcs = [], []
-
-        with open(CONFIG["command_dir"] / file, "r", encoding="utf-8") as f:
-            if desc := PATTERNS.desc.match(content := f.read()):
-                cmds += f"\n\n[i]{desc.group(1).strip("\n\"'")}[_]"
+        meta = index.get(CONFIG["command_dir"] / file)
 
-            sys_argv_comments = PATTERNS.sys_argv.findall(content)
-            get_args_funcs = [func_args[1] for func_args in PATTERNS.get_args.findall(content) if func_args[1]]
+        if meta["desc"] is not None:
+            cmds += f"\n\n[i]{meta['desc']}[_]"
 
-            print(cmd_name, sys_argv_comments, PATTERNS.get_args.findall(content), sep="\n", end="\n\n")
-
-        arg_parse_configs: ArgParseConfigs = {}
-
-        if len(get_args_funcs) > 0:
+        if meta["arg_parse_configs"] is not None:
             try:
-                # GET ARGUMENTS OF FIRST NON-EMPTY Console.get_args() CALL
-                func_args = ""
-                if len(get_args_funcs) > 1:
-                    for func_args in get_args_funcs:
-                        if (func_args := func_args.strip()):
-                            break
-                elif len(get_args_funcs) == 1:
-                    func_args = get_args_funcs[0]
-
-                # PARSE THE FUNCTION ARGUMENTS
-                for arg in PATTERNS.arg.finditer(func_args):
-                    print(arg.groups())
-                    if (key := arg.group(2)) and (val := arg.group(3)):
-                        arg_parse_configs[key.strip()] = String.to_type(val.strip().rstrip(","))
-                cmds += arguments_desc(arg_parse_configs)
-
+                cmds += arguments_desc(meta["arg_parse_configs"])
             except Exception:
                 pass
 
-        elif len(sys_argv_comments) > 0:
-            # PARSE FIRST NON-EMPTY ARGS-DESCRIBING COMMENT
-            for comment in sys_argv_comments:
-                if (comment := comment.strip()).startswith("["):
-                    arg_parse_configs.update(parse_args_comment(comment))
-            cmds += arguments_desc(arg_parse_configs)
-
         cmds += "\n\n"
 
     return cmds
@@ -220,56 +496,123 @@ class GitHubDiffs(TypedDict):
     updated_commands: list[str]
     deleted_commands: list[str]
     download_urls: dict[str, str]
+    download_shas: dict[str, str]
+    local_filenames: dict[str, str]
+
+
+def create_session() -> requests.Session:
+    """Create an HTTP session, which keeps one pooled connection per concurrent request open for reuse."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=CONFIG["github_updates"]["max_connections"])
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def load_listings() -> dict[str, dict]:
+    try:
+        with open(LISTINGS_PATH, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except Exception:
+        return {}
+
+
+def save_listings(listings: dict[str, dict]) -> None:
+    try:
+        LISTINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = LISTINGS_PATH.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(listings, file)
+        os.replace(tmp_path, LISTINGS_PATH)
+    except Exception:
+        pass  # WITHOUT THE STORED LISTINGS, THEY'RE JUST FETCHED IN FULL AGAIN NEXT TIME
+
+
+def fetch_listing(session: requests.Session, api_url: str, listings: dict[str, dict]) -> list[dict[str, str]]:
+    """Fetch the files of a GitHub directory listing. If the listing was fetched before, it's only sent again
+    if its ETag changed, so an unchanged listing only costs a `304 Not Modified` response."""
+    headers = {"Accept": "application/vnd.github+json"}
+    if cached := listings.get(api_url):
+        headers["If-None-Match"] = cached["etag"]
+
+    response = session.get(api_url, headers=headers, timeout=10)
+    if response.status_code == 304 and cached:
+        return cached["files"]
+    response.raise_for_status()
+
+    files = [
+        {"name": item["name"], "download_url": item["download_url"], "sha": item["sha"]}
+        for item in response.json() if item["type"] == "file"
+    ]
+    if etag := response.headers.get("ETag"):
+        listings[api_url] = {"etag": etag, "files": files}
+    return files
 
 
-def get_github_diffs(local_files: set[str]) -> GitHubDiffs:
+def get_api_url(repo_url: str) -> Optional[str]:
+    """Get the GitHub API URL that lists the contents of the directory a repo URL points to."""
+    # PARSE THE URL TO EXTRACT REPO INFO
+    url_pattern = re.match(r"https?://github\.com/([^/]+)/([^/]+)(?:/(?:tree|blob)/([^/]+)(/.*)?)?", repo_url)
+    if not url_pattern:
+        return None
+
+    user, repo, branch, path = url_pattern.groups()
+    branch, path = branch or "main", (path or "").strip("/")
+
+    api_url = f"{CONFIG['github_updates']['github_api_url'].rstrip('/')}/repos/{user}/{repo}/contents/{path}"
+    if branch: api_url += f"?ref={branch}"
+    return api_url
+
+
+def get_github_diffs(local_files: set[str], index: CommandIndex, session: requests.Session) -> GitHubDiffs:
     """Check for new files, updated files, and deleted files on GitHub compared to local command-directory."""
-    result: GitHubDiffs = {"new_commands": [], "updated_commands": [], "deleted_commands": [], "download_urls": {}}
+    result: GitHubDiffs = {
+        "new_commands": [],
+        "updated_commands": [],
+        "deleted_commands": [],
+        "download_urls": {},
+        "download_shas": {},
+        "local_filenames": {},
+    }
 
     try:
-        # MERGE FILES FROM ALL GITHUB REPO URLS
-        github_files: dict[str, dict[str, str]] = {}
+        # FETCH THE LISTINGS OF ALL GITHUB REPO URLS AT ONCE, OVER THE SAME POOLED CONNECTIONS
+        api_urls = [api_url for repo_url in CONFIG["github_updates"]["github_repo_urls"] if (api_url := get_api_url(repo_url))]
+        listings = load_listings()
 
-        for repo_url in CONFIG["github_updates"]["github_repo_urls"]:
+        def try_fetch_listing(api_url: str) -> list[dict[str, str]]:
             try:
-                # PARSE THE URL TO EXTRACT REPO INFO
-                url_pattern = re.match(r"https?://github\.com/([^/]+)/([^/]+)(?:/(?:tree|blob)/([^/]+)(/.*)?)?", repo_url)
-                if not url_pattern:
-                    continue
-
-                user, repo, branch, path = url_pattern.groups()
-                branch, path = branch or "main", (path or "").strip("/")
-
-                # USE GITHUB API TO GET DIRECTORY CONTENTS
-                api_url = f"https://api.github.com/repos/{user}/{repo}/contents/{path}"
-                if branch: api_url += f"?ref={branch}"
-
-                response = requests.get(api_url, timeout=10)
-                response.raise_for_status()
-
-                # MERGE FILES FROM THIS REPO (LATER URLS OVERRIDE EARLIER ONES IF SAME NAME)
-                for item in response.json():
-                    if item["type"] == "file" and item["name"].endswith((".py", ".pyw")):
-                        cmd_name = Path(item["name"]).stem
-                        github_files[cmd_name] = {
-                            "filename": item["name"],
-                            "download_url": item["download_url"],
-                            "sha": item["sha"],
-                        }
+                return fetch_listing(session, api_url, listings)
             except Exception:
-                pass  # SKIP REPOS THAT CAN'T BE ACCESSED
+                return []  # SKIP REPOS THAT CAN'T BE ACCESSED
 
-        # CREATE MAPPING FROM CMD NAME TO ACTUAL FILENAME FOR LOCAL FILES
-        local_file_map = {Path(f).stem: f for f in local_files}
-        local_cmd_names = set(local_file_map.keys())
+        with ThreadPoolExecutor(max_workers=max(1, min(len(api_urls), CONFIG["github_updates"]["max_connections"]))) as executor:
+            repo_listings = list(executor.map(try_fetch_listing, api_urls))
+        save_listings(listings)
 
-        # GET LOCAL FILES THAT HAVE UPDATE MARKER
-        local_updateable_files = set()
+        # MERGE FILES FROM ALL REPOS (LATER URLS OVERRIDE EARLIER ONES IF SAME NAME)
+        github_files: dict[str, dict[str, str]] = {}
+        for repo_listing in repo_listings:
+            for item in repo_listing:
+                if item["name"].endswith((".py", ".pyw")):
+                    cmd_name = Path(item["name"]).stem
+                    github_files[cmd_name] = {
+                        "filename": item["name"],
+                        "download_url": item["download_url"],
+                        "sha": item["sha"],
+                    }
+
+        local_cmd_names = {Path(f).stem for f in local_files}
+
+        # GET LOCAL FILES THAT HAVE UPDATE MARKER, WITH THEIR BLOB SHA FROM THE INDEX
+        local_updateable_files: dict[str, Optional[str]] = {}
         for filename in local_files:
-            filepath = CONFIG["command_dir"] / filename
-            options = get_xcmds_options(str(filepath))
-            if options.get("update_check"):
-                local_updateable_files.add(Path(filename).stem)
+            try:
+                if (meta := index.get(CONFIG["command_dir"] / filename))["update_check"]:
+                    local_updateable_files[Path(filename).stem] = meta["blob_sha"]
+                    result["local_filenames"][Path(filename).stem] = filename
+            except OSError:
+                pass
 
         # CHECK FOR NEW FILES
         if CONFIG["github_updates"]["check_for_new_commands"]:
@@ -277,28 +620,16 @@ def get_github_diffs(local_files: set[str]) -> GitHubDiffs:
                 if cmd_name not in local_cmd_names:
                     result["new_commands"].append(cmd_name)
                     result["download_urls"][github_files[cmd_name]["filename"]] = github_files[cmd_name]["download_url"]
+                    result["download_shas"][github_files[cmd_name]["filename"]] = github_files[cmd_name]["sha"]
 
         # CHECK FOR UPDATED FILES (ONLY THOSE WITH UPDATE MARKER)
         if CONFIG["github_updates"]["check_for_command_updates"]:
-            for cmd_name in local_updateable_files:
-                if cmd_name in github_files:
-                    try:
-                        local_filename = local_file_map[cmd_name]
-                        local_path = CONFIG["command_dir"] / local_filename
-
-                        # READ AS TEXT AND NORMALIZE TO LF (UNIX) LINE ENDINGS LIKE GITHUB
-                        with open(local_path, "r", encoding="utf-8", newline="") as f:
-                            local_content = f.read().replace("\r\n", "\n").replace("\r", "\n").encode("utf-8")
-
-                        # GITHUB USES: "blob " + FILESIZE + "\0" + CONTENT THEN SHA1 HASH
-                        local_sha = hashlib.sha1(f"blob {len(local_content)}\0".encode() + local_content).hexdigest()
-
-                        # COMPARE WITH GITHUB'S SHA
-                        if local_sha != github_files[cmd_name]["sha"]:
-                            result["updated_commands"].append(cmd_name)
-                            result["download_urls"][github_files[cmd_name]["filename"]] = github_files[cmd_name]["download_url"]
-                    except Exception:
-                        pass  # SKIP FILES THAT CAN'T BE COMPARED
+            for cmd_name, local_sha in local_updateable_files.items():
+                # COMPARE WITH GITHUB'S SHA
+                if cmd_name in github_files and local_sha != github_files[cmd_name]["sha"]:
+                    result["updated_commands"].append(cmd_name)
+                    result["download_urls"][github_files[cmd_name]["filename"]] = github_files[cmd_name]["download_url"]
+                    result["download_shas"][github_files[cmd_name]["filename"]] = github_files[cmd_name]["sha"]
 
         # CHECK FOR DELETED FILES (LOCAL FILES WITH UPDATE MARKER NOT IN GITHUB)
         if CONFIG["github_updates"]["check_for_new_commands"]:
@@ -351,83 +682,195 @@ def github_diffs_str(github_diffs: GitHubDiffs) -> str:
     return diffs
 
 
-def download_files(github_diffs: GitHubDiffs) -> None:
-    """Download new and updated files from GitHub, and delete removed files."""
+def download_file(session: requests.Session, url: str, expected_sha: str) -> str:
+    """Download a file and make sure it's exactly the file GitHub listed, by comparing its blob SHA."""
+    response = session.get(url, timeout=10)
+    response.raise_for_status()
+    content = response.content.decode("utf-8")
+    if get_blob_sha(content) != expected_sha:
+        raise ValueError("The downloaded content doesn't match the listed file.")
+    return content
+
+
+class InstallOperation(TypedDict):
+    cmd_name: str
+    target: str  # THE FILENAME IN THE COMMAND DIRECTORY
+    staged: Optional[str]  # THE FILENAME IN THE STAGING DIRECTORY OR `None` FOR DELETIONS
+    existed: bool  # WHETHER THE TARGET EXISTED BEFORE AND WAS MOVED INTO THE BACKUP DIRECTORY
+
+
+def install_files(github_diffs: GitHubDiffs, staging_dir: Path) -> bool:
+    """Move the staged files into the command directory and the deleted files out of it, each with an atomic rename.
+    The previous versions are moved into the backup directory, after writing a journal of all planned operations,
+    so the update can be rolled back, even if it was interrupted. If an operation fails, the update is rolled back."""
+    command_dir = CONFIG["command_dir"]
+    backup_dir = command_dir / BACKUP_DIR_NAME
+    operations: list[InstallOperation] = []
+
+    for filename in github_diffs["download_urls"]:
+        cmd_name = Path(filename).stem
+        # REPLACE THE EXISTING FILE, OR SAVE WITH OR WITHOUT EXTENSION BASED ON PLATFORM
+        target = github_diffs["local_filenames"].get(cmd_name) or (filename if System.is_win else cmd_name)
+        operations.append({"cmd_name": cmd_name, "target": target, "staged": filename, "existed": (command_dir / target).exists()})
+    for cmd_name in github_diffs["deleted_commands"]:
+        if (target := github_diffs["local_filenames"].get(cmd_name)) and (command_dir / target).exists():
+            operations.append({"cmd_name": cmd_name, "target": target, "staged": None, "existed": True})
+        else:
+            FormatCodes.print(f"[dim|br:yellow](⚠ Could not find [b]({cmd_name}) to delete)")
+
+    # THE LAST UPDATE CAN'T BE ROLLED BACK ANYMORE, ONCE THIS ONE STARTS
+    shutil.rmtree(backup_dir, ignore_errors=True)
+    backup_dir.mkdir()
+    with open(backup_dir / "journal.json", "w", encoding="utf-8") as f:
+        json.dump(operations, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    try:
+        for operation in operations:
+            target_path = command_dir / operation["target"]
+            if operation["existed"]:
+                os.replace(target_path, backup_dir / operation["target"])
+            if operation["staged"]:
+                os.replace(staging_dir / operation["staged"], target_path)
+    except Exception as e:
+        FormatCodes.print(f"[br:red](⨯ Failed to install the updates [dim]/({e})[_])")
+        rollback_update()
+        return False
+
+    # ONLY A JOURNAL WITHOUT THIS MARKER BELONGS TO AN UPDATE THAT WAS INTERRUPTED
+    (backup_dir / "complete").touch()
+    for operation in operations:
+        action = "Deleted" if operation["staged"] is None else "Updated" if operation["existed"] else "Added"
+        FormatCodes.print(f"[br:green](✓ {action} [b]({operation['cmd_name']}))")
+    return True
+
+
+def rollback_update() -> bool:
+    """Restore the command directory to how it was before the last update, using the backup directory."""
+    command_dir = CONFIG["command_dir"]
+    backup_dir = command_dir / BACKUP_DIR_NAME
+    try:
+        with open(backup_dir / "journal.json", "r", encoding="utf-8") as f:
+            operations: list[InstallOperation] = json.load(f)
+    except FileNotFoundError:
+        FormatCodes.print("[dim|br:yellow](⚠ There's no update to roll back)\n")
+        return False
+
+    for operation in reversed(operations):
+        target_path, backup_path = command_dir / operation["target"], backup_dir / operation["target"]
+        if backup_path.exists():
+            os.replace(backup_path, target_path)
+        elif not operation["existed"]:
+            target_path.unlink(missing_ok=True)  # REMOVE THE ADDED FILE
+        # (A FILE THAT EXISTED BUT ISN'T IN THE BACKUP WAS NEVER TOUCHED, SINCE THE UPDATE WAS INTERRUPTED BEFORE IT)
+
+    shutil.rmtree(backup_dir, ignore_errors=True)
+    FormatCodes.print(f"[br:green](⟲ Rolled back the last update of [b]({len(operations)}) command{'' if len(operations) == 1 else 's'})\n")
+    return True
+
+
+def is_update_interrupted() -> bool:
+    """Whether the last update was interrupted while installing, so the command directory is only partly updated."""
+    backup_dir = CONFIG["command_dir"] / BACKUP_DIR_NAME
+    return (backup_dir / "journal.json").exists() and not (backup_dir / "complete").exists()
+
+
+def download_files(github_diffs: GitHubDiffs, session: requests.Session) -> None:
+    """Download new and updated files from GitHub into a staging directory, verify them,
+    and then install them and delete removed files all at once, or not at all."""
     downloads = github_diffs["download_urls"].items()
-    deletions = github_diffs["deleted_commands"]
-    total_operations = len(downloads) + len(deletions)
+    total_operations = len(downloads) + len(github_diffs["deleted_commands"])
 
     if total_operations == 0:
         return
 
+    # A NEW UPDATE WOULD REPLACE THE BACKUP, WHICH IS THE ONLY WAY TO UNDO THE HALF-INSTALLED ONE
+    # (AND THE DIFFS WERE COMPUTED AGAINST THE HALF-INSTALLED FILES, SO THEY WOULDN'T BE RIGHT AFTER ROLLING IT BACK ANYWAY)
+    if is_update_interrupted():
+        FormatCodes.print(
+            "\n[br:red](⨯ Not updating, since the last update was interrupted while installing.)\n"
+            "[dim](Roll it back first with [b](x-cmds --rollback), then check for updates again.)\n\n"
+        )
+        return
+
     if not Console.confirm("\n[b](Execute these updates?)", end="\n", default_is_yes=True):
         FormatCodes.print(f"[dim|magenta](⨯ Not updating commands from GitHub)\n\n")
         return
 
-    success_count = 0
-
-    # DOWNLOAD NEW AND UPDATED FILES
-    for filename, url in downloads:
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-
-            # SAVE WITH OR WITHOUT EXTENSION BASED ON PLATFORM
-            cmd_name = Path(filename).stem
-            file_path = CONFIG["command_dir"] / (filename if System.is_win else cmd_name)
-
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(response.text)
-
-            # MAKE EXECUTABLE ON UNIX-LIKE SYSTEMS
-            if not System.is_win:
-                os.chmod(file_path, 0o755)
+    # REMOVE STAGING DIRECTORIES LEFT BEHIND BY A CRASHED UPDATE
+    for leftover in CONFIG["command_dir"].glob(f"{STAGING_PREFIX}*"):
+        shutil.rmtree(leftover, ignore_errors=True)
 
-            action = "Added" if cmd_name in github_diffs["new_commands"] else "Updated"
-            FormatCodes.print(f"[br:green](✓ {action} [b]({cmd_name}))")
-            success_count += 1
-        except Exception as e:
-            FormatCodes.print(f"[br:red](⨯ Failed to download [b]({filename}) [dim]/({e})[_])")
+    staging_dir = Path(tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=CONFIG["command_dir"]))
+    try:
+        failed_count = 0
+
+        # DOWNLOAD ALL NEW AND UPDATED FILES AT ONCE, BUT SAVE THEM IN ORDER
+        with ThreadPoolExecutor(max_workers=max(1, min(len(downloads), CONFIG["github_updates"]["max_connections"]))) as executor:
+            pending = {
+                filename: executor.submit(download_file, session, url, github_diffs["download_shas"][filename])
+                for filename, url in downloads
+            }
+
+            for filename, download in pending.items():
+                try:
+                    content = download.result()
+                    with open(staging_dir / filename, "w", encoding="utf-8") as f:
+                        f.write(content)
+
+                    # MAKE EXECUTABLE ON UNIX-LIKE SYSTEMS
+                    if not System.is_win:
+                        os.chmod(staging_dir / filename, 0o755)
+                except Exception as e:
+                    FormatCodes.print(f"[br:red](⨯ Failed to download [b]({filename}) [dim]/({e})[_])")
+                    failed_count += 1
+
+        if failed_count > 0:
+            FormatCodes.print(
+                f"\n[br:red](Not updating any commands, since [b]({failed_count})/{len(downloads)}"
+                f" download{'s' if len(downloads) > 1 else ''} failed.)\n\n"
+            )
+            return
+
+        if install_files(github_diffs, staging_dir):
+            FormatCodes.print(
+                f"\nSuccessfully completed [br:green]([b]({total_operations})/{total_operations})"
+                f" operation{'s' if total_operations > 1 else ''}! [dim](Undo them with [b](x-cmds --rollback).)\n\n"
+            )
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
 
-    # DELETE REMOVED FILES
-    for cmd_name in deletions:
-        try:
-            # TRY BOTH WITH AND WITHOUT EXTENSION
-            deleted = False
-            for ext in [".py", ".pyw", ""]:
-                file_path = CONFIG["command_dir"] / f"{cmd_name}{ext}"
-                if file_path.exists():
-                    file_path.unlink()
-                    deleted = True
-                    break
-
-            if deleted:
-                FormatCodes.print(f"[br:green](✓ Deleted [b]({cmd_name}))")
-                success_count += 1
-            else:
-                FormatCodes.print(f"[dim|br:yellow](⚠ Could not find [b]({cmd_name}) to delete)")
-        except Exception as e:
-            FormatCodes.print(f"[br:red](⨯ Failed to delete [b]({cmd_name}) [dim]/({e})[_])")
 
-    color = 'br:green' if success_count == total_operations else 'br:red' if success_count == 0 else 'br:yellow'
-    FormatCodes.print(f"\nSuccessfully completed [{color}]([b]({success_count})/{total_operations}) operation{'s' if total_operations > 1 else ''}!\n\n")
+def main() -> None:
+    if ARGS.rollback.exists:
+        rollback_update()
 
+    index = CommandIndex(INDEX_PATH)
+    python_files = get_python_files(index)
 
-def main() -> None:
-    python_files = get_python_files()
+    if ARGS.completion.exists:
+        # ONLY OUTPUT THE SCRIPT, SO IT CAN BE SOURCED DIRECTLY (E.G. `eval "$(x-cmds --completion=bash)"`)
+        save_completion_index(index, python_files)
+        index.save()
+        print(get_completion_script(ARGS.completion.values[0] if ARGS.completion.values else Path(os.environ.get("SHELL", "bash")).name), end="")
+        return
 
-    FormatCodes.print(get_commands_str(python_files))
+    FormatCodes.print(get_commands_str(python_files, index))
+    save_completion_index(index, python_files)
+    index.save()
 
     if ARGS.update_check.exists:
         spinner = Spinner("⟳ Checking for updates")
         spinner.set_format(["[magenta]({l})", "[b|magenta]({a})"])
 
-        with spinner.context():
-            github_diffs = get_github_diffs(python_files)
+        with create_session() as session:
+            with spinner.context():
+                github_diffs = get_github_diffs(python_files, index, session)
 
-        FormatCodes.print(github_diffs_str(github_diffs))
+            FormatCodes.print(github_diffs_str(github_diffs))
 
-        download_files(github_diffs)
+            download_files(github_diffs, session)
 
 
 if __name__ == "__main__":
@@ -2,13 +2,22 @@
 #[x-cmds]: UPDATE
 """List all modules imported across Python files in the script directory.
 Can filter to show only non-standard library modules."""
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 from xulbux.console import Spinner
 from xulbux import FormatCodes, Console, FileSys, Data
+import importlib.metadata
+import multiprocessing
 import subprocess
+import tokenize
+import warnings
+import hashlib
+import json
+import ast
 import sys
-import re
+import io
+import os
 
 
 ARGS = Console.get_args({
@@ -21,28 +30,14 @@ ARGS = Console.get_args({
     "help": {"-h", "--help"},
 })
 
-# PYTHON STANDARD LIBRARY MODULES (Python 3.x)
-STDLIB_MODULES = {
-    "abc", "aifc", "argparse", "array", "ast", "asynchat", "asyncio", "asyncore", "atexit", "audioop", "base64", "bdb",
-    "binascii", "binhex", "bisect", "builtins", "bz2", "calendar", "cgi", "cgitb", "chunk", "cmath", "cmd", "code", "codecs",
-    "codeop", "collections", "colorsys", "compileall", "concurrent", "configparser", "contextlib", "contextvars", "copy",
-    "copyreg", "cProfile", "crypt", "csv", "ctypes", "curses", "dataclasses", "datetime", "dbm", "decimal", "difflib", "dis",
-    "distutils", "doctest", "email", "encodings", "enum", "errno", "faulthandler", "fcntl", "filecmp", "fileinput", "fnmatch",
-    "formatter", "fractions", "ftplib", "functools", "gc", "getopt", "getpass", "gettext", "glob", "graphlib", "grp", "gzip",
-    "hashlib", "heapq", "hmac", "html", "http", "imaplib", "imghdr", "imp", "importlib", "inspect", "io", "ipaddress",
-    "itertools", "json", "keyword", "lib2to3", "linecache", "locale", "logging", "lzma", "mailbox", "mailcap", "marshal",
-    "math", "mimetypes", "mmap", "modulefinder", "msilib", "msvcrt", "multiprocessing", "netrc", "nis", "nntplib", "numbers",
-    "operator", "optparse", "os", "ossaudiodev", "parser", "pathlib", "pdb", "pickle", "pickletools", "pipes", "pkgutil",
-    "platform", "plistlib", "poplib", "posix", "posixpath", "pprint", "profile", "pstats", "pty", "pwd", "py_compile",
-    "pyclbr", "pydoc", "queue", "quopri", "random", "re", "readline", "reprlib", "resource", "rlcompleter", "runpy", "sched",
-    "secrets", "select", "selectors", "shelve", "shlex", "shutil", "signal", "site", "smtpd", "smtplib", "sndhdr", "socket",
-    "socketserver", "spwd", "sqlite3", "ssl", "stat", "statistics", "string", "stringprep", "struct", "subprocess", "sunau",
-    "symbol", "symtable", "sys", "sysconfig", "syslog", "tabnanny", "tarfile", "telnetlib", "tempfile", "termios", "test",
-    "textwrap", "threading", "time", "timeit", "tkinter", "token", "tokenize", "tomllib", "trace", "traceback", "tracemalloc",
-    "tty", "turtle", "turtledemo", "types", "typing", "unicodedata", "unittest", "urllib", "uu", "uuid", "venv", "warnings",
-    "wave", "weakref", "webbrowser", "winreg", "winsound", "wsgiref", "xdrlib", "xml", "xmlrpc", "zipapp", "zipfile",
-    "zipimport", "zlib", "_thread"
-}
+PROCESS_POOL_MIN_FILES = 64  # FEWER FILES ARE PARSED FASTER IN THIS PROCESS THAN IT TAKES TO START THE WORKER PROCESSES
+
+# THE STANDARD LIBRARY MODULES OF THE RUNNING PYTHON VERSION
+STDLIB_MODULES = sys.stdlib_module_names
+
+DISTRIBUTIONS_CACHE_DIR = Path(
+    os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+) / "x-modules"
 
 
 def print_help():
@@ -57,7 +52,7 @@ def print_help():
   [br:blue](-r), [br:blue](--recursive)         Scan subdirectories recursively
   [br:blue](-l), [br:blue](--list)              Output only module names without extra info
   [br:blue](-j), [br:blue](--json)              Output as JSON format [dim]((ignored if [br:blue](-i) is used))
-  [br:blue](-i), [br:blue](--install)           Install all external modules using pip
+  [br:blue](-i), [br:blue](--install)           Install the packages of all external modules using pip
 
 [b](Examples:)
   [br:green](modules)                 [dim](# [i](List all imported modules))
@@ -71,32 +66,73 @@ def print_help():
     FormatCodes.print(help_text)
 
 
+def extract_imports_from_tokens(source: bytes) -> set[str]:
+    """Extract all imported module names from the tokens of Python source code, which can't be parsed
+    (e.g. written for an older or newer Python version). Only finds imports at the start of a statement."""
+    imports: set[str] = set()
+    statement: list[str] = []
+
+    def add_statement_imports() -> None:
+        if len(statement) > 1 and statement[0] == "import":
+            # import a.b, c as d, …
+            expects_module = True
+            for part in statement[1:]:
+                if part == ",":
+                    expects_module = True
+                elif expects_module and part not in {"(", ")"}:
+                    imports.add(part)
+                    expects_module = False
+        elif len(statement) > 1 and statement[0] == "from" and statement[1] not in {".", "...", "import"}:
+            # from a.b import c (RELATIVE IMPORTS START WITH `.`)
+            imports.add(statement[1])
+
+    try:
+        for token in tokenize.tokenize(io.BytesIO(source).readline):
+            if token.type == tokenize.NEWLINE or token.string == ";":
+                add_statement_imports()
+                statement.clear()
+            elif token.type in {tokenize.NAME, tokenize.OP}:
+                statement.append(token.string)
+        add_statement_imports()
+    except (tokenize.TokenError, SyntaxError):
+        pass  # KEEP THE IMPORTS FOUND UP TO WHERE THE SOURCE BROKE OFF
+
+    return imports
+
+
 def extract_imports(file_path: Path) -> set[str]:
     """Extract all imported module names from a Python file."""
-    imports = set()
-    import_pattern = re.compile(r"^\s*(?:from\s+(\S+)|import\s+(\S+))", re.MULTILINE)
+    imports: set[str] = set()
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-            # REMOVE DOCSTRINGS AND COMMENTS BEFORE PROCESSING
-            # TRIPLE-QUOTED STRINGS (DOCSTRINGS)
-            content = re.sub(r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'', '', content)
-            # SINGLE/DOUBLE QUOTED STRINGS
-            content = re.sub(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'', '', content)
-            # COMMENTS (LINES STARTING WITH #)
-            content = re.sub(r'#.*$', '', content, flags=re.MULTILINE)
-
-            for match in import_pattern.finditer(content):
-                module = match.group(1) or match.group(2)
-                # SKIP RELATIVE IMPORTS (starting with .)
-                if module.startswith("."):
-                    continue
-                # ADD TOP-LEVEL MODULE NAME
-                imports.add(module.split(".")[0])
-    except Exception:
-        pass
+        with open(file_path, "rb") as f:
+            source = f.read()
+    except OSError:
+        return imports
+    if b"import" not in source:
+        return imports  # NO NEED TO PARSE THE FILE AT ALL
+
+    try:
+        with warnings.catch_warnings():  # E.G. INVALID ESCAPE SEQUENCES IN OTHER PEOPLE'S FILES AREN'T OUR CONCERN
+            warnings.simplefilter("ignore")
+            tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return extract_imports_from_tokens(source)
+
+    # ONLY WALK THROUGH STATEMENTS, SINCE IMPORTS CAN'T BE INSIDE EXPRESSIONS
+    statements: list[ast.AST] = list(tree.body)
+    while statements:
+        node = statements.pop()
+        if isinstance(node, ast.Import):
+            # ADD TOP-LEVEL MODULE NAMES
+            imports.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            # SKIP RELATIVE IMPORTS (starting with .)
+            if node.level == 0 and node.module:
+                imports.add(node.module.split(".")[0])
+        else:
+            for field in ("body", "orelse", "finalbody", "handlers", "cases"):
+                statements.extend(getattr(node, field, None) or ())
 
     return imports
 
@@ -104,32 +140,76 @@ def extract_imports(file_path: Path) -> set[str]:
 def get_all_modules(directory: Path, recursive: bool = False, external_only: bool = False) -> dict[str, list[str]]:
     """Get all modules used across Python files, grouped by module name."""
     module_usage: dict[str, list[str]] = {}
+    python_files: list[Path] = []
 
     if not directory.is_dir():
         raise ValueError(f"Directory not found: {directory}")
 
-    def scan_directory(dir_path: Path, base_path: Optional[Path] = None):
-        """Scan a directory for Python files and extract imports."""
-        if base_path is None:
-            base_path = dir_path
+    def scan_directory(dir_path: Path):
+        """Scan a directory for Python files."""
         try:
             for full_path in dir_path.iterdir():
                 if full_path.is_file() and full_path.suffix in (".py", ".pyw"):
-                    for module in extract_imports(full_path):
-                        if external_only and module in STDLIB_MODULES:
-                            continue
-                        if module not in module_usage:
-                            module_usage[module] = []
-                        module_usage[module].append(str(full_path.relative_to(base_path).with_suffix('')))
+                    python_files.append(full_path)
                 elif recursive and full_path.is_dir():
-                    scan_directory(full_path, base_path)
+                    scan_directory(full_path)
         except PermissionError:
             pass  # SKIP DIRECTORIES WE CAN'T ACCESS
 
     scan_directory(directory)
+
+    # PARSE THE FILES IN PARALLEL PROCESSES, SINCE PARSING IS BOUND TO THE GIL
+    if len(python_files) >= PROCESS_POOL_MIN_FILES and (num_workers := os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            file_imports = list(pool.map(extract_imports, python_files, chunksize=max(1, len(python_files) // (num_workers * 8))))
+    else:
+        file_imports = [extract_imports(file_path) for file_path in python_files]
+
+    for full_path, imports in zip(python_files, file_imports):
+        for module in imports:
+            if external_only and module in STDLIB_MODULES:
+                continue
+            if module not in module_usage:
+                module_usage[module] = []
+            module_usage[module].append(str(full_path.relative_to(directory).with_suffix('')))
+
     return module_usage
 
 
+def get_import_distributions() -> dict[str, list[str]]:
+    """Get the installed distributions (pip packages) that provide each top-level import name.
+    Building this reads the metadata of all installed distributions, so it's stored per interpreter
+    and only built again after a directory on the import path changed (e.g. since something was installed)."""
+    cache_path = DISTRIBUTIONS_CACHE_DIR / f"distributions-{hashlib.blake2b(sys.executable.encode(), digest_size=8).hexdigest()}.json"
+    # (THE FIRST PATH IS THE SCRIPT DIRECTORY, WHICH CHANGES WITHOUT ANYTHING BEING INSTALLED)
+    signature = [sys.version] + [f"{path}:{os.stat(path).st_mtime_ns}" for path in sys.path[1:] if os.path.isdir(path)]
+
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            if (cached := json.load(f))["signature"] == signature:
+                return cached["distributions"]
+    except Exception:
+        pass  # A MISSING OR BROKEN CACHE IS JUST BUILT AGAIN
+
+    distributions = {name: sorted(set(dists)) for name, dists in importlib.metadata.packages_distributions().items()}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"signature": signature, "distributions": distributions}, f)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        pass
+    return distributions
+
+
+def get_install_packages(modules: dict[str, list[str]]) -> dict[str, list[str]]:
+    """Get the distributions to install for each module. Modules that aren't installed yet
+    can't be looked up, so their import name is assumed to be the distribution name."""
+    distributions = get_import_distributions()
+    return {module: distributions.get(module) or [module] for module in modules}
+
+
 def show_and_install_modules(modules: dict[str, list[str]], external_only: bool, install: bool = False) -> None:
     title_start = "INSTALLING" if install else "FOUND"
     output = (
@@ -137,6 +217,8 @@ def show_and_install_modules(modules: dict[str, list[str]], external_only: bool,
         else f"[b|bg:black]([in]( {title_start} ) {len(modules)} [in]( MODULES ))\n"
     )
 
+    packages = get_install_packages(modules) if install else {}
+
     if ARGS.list.exists:
         output += f"\n[b|br:cyan]{'\n'.join(sorted(modules.keys()))}[_]"
     else:
@@ -145,6 +227,8 @@ def show_and_install_modules(modules: dict[str, list[str]], external_only: bool,
         for i, (module, files) in enumerate(sorted(modules.items()), 1):
             usage_count = len(files)
             line = f"\n [i|dim|br:cyan]({i:>{num_width}})  [b|br:cyan]({module})"
+            if install and packages[module] != [module]:
+                line += f" [br:cyan](→ {', '.join(packages[module])})"
             line += f" [dim](used in {usage_count} file{'s' if usage_count != 1 else ''})"
             rendered_line_len = len(FormatCodes.remove(line))
 
@@ -175,38 +259,39 @@ def show_and_install_modules(modules: dict[str, list[str]], external_only: bool,
         return
 
     print()
-    failed_modules = []
+    failed_packages = []
 
-    for module in sorted(modules):
-        with Spinner(f"Installing [b]({module})", ["[br:cyan]({l} [b]({a})) "]).context():
+    # INSTALL EACH DISTRIBUTION ONCE, EVEN IF IT PROVIDES MULTIPLE MODULES
+    for package in sorted({package for module_packages in packages.values() for package in module_packages}):
+        with Spinner(f"Installing [b]({package})", ["[br:cyan]({l} [b]({a})) "]).context():
             try:
                 result = subprocess.run(
-                    [sys.executable, "-m", "pip", "install", "--upgrade", module],
+                    [sys.executable, "-m", "pip", "install", "--upgrade", package],
                     capture_output=True,
                     text=True,
-                    timeout=300  # 5 MINUTE TIMEOUT PER MODULE
+                    timeout=300  # 5 MINUTE TIMEOUT PER PACKAGE
                 )
 
                 if result.returncode == 0:
-                    FormatCodes.print(f"[br:green](✓ Installed [b]({module}))")
+                    FormatCodes.print(f"[br:green](✓ Installed [b]({package}))")
                 else:
-                    FormatCodes.print(f"[br:red](⨯ Failed to install [b]({module}):)\n[red]│ " + "\n[red]│ ".join(result.stderr.strip().splitlines()) + "[_]")
-                    failed_modules.append(module)
+                    FormatCodes.print(f"[br:red](⨯ Failed to install [b]({package}):)\n[red]│ " + "\n[red]│ ".join(result.stderr.strip().splitlines()) + "[_]")
+                    failed_packages.append(package)
             except subprocess.TimeoutExpired:
-                FormatCodes.print(f"[br:red](⨯ Timed out installing [b]({module}))")
-                failed_modules.append(module)
+                FormatCodes.print(f"[br:red](⨯ Timed out installing [b]({package}))")
+                failed_packages.append(package)
             except Exception as e:
-                FormatCodes.print(f"[br:red](⨯ Error installing [b]({module}):)\n[red]│ " + "\n[red]│ ".join(str(e).splitlines()) + "[_]")
-                failed_modules.append(module)
+                FormatCodes.print(f"[br:red](⨯ Error installing [b]({package}):)\n[red]│ " + "\n[red]│ ".join(str(e).splitlines()) + "[_]")
+                failed_packages.append(package)
 
     print()
-    if failed_modules:
-        FormatCodes.print(f"[b|br:yellow](Failed to install {len(failed_modules)} module{'s' if len(failed_modules) != 1 else ''}:)")
-        for module in failed_modules:
-            FormatCodes.print(f"[yellow]([dim]( • ){module})")
+    if failed_packages:
+        FormatCodes.print(f"[b|br:yellow](Failed to install {len(failed_packages)} package{'s' if len(failed_packages) != 1 else ''}:)")
+        for package in failed_packages:
+            FormatCodes.print(f"[yellow]([dim]( • ){package})")
         print()
     else:
-        FormatCodes.print("[b|br:green](All modules installed successfully!)\n")
+        FormatCodes.print("[b|br:green](All packages installed successfully!)\n")
 
 
 def main() -> None:
@@ -4,9 +4,17 @@
 with a lost of options and customization."""
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional, NamedTuple, cast
+from typing import Optional, NamedTuple, Generator, Iterable, cast
 from xulbux.base.consts import COLOR
 from xulbux import FormatCodes, Console, File
+import ctypes.util
+import tempfile
+import select
+import threading
+import struct
+import ctypes
+import random
+import math
 import time
 import sys
 import os
@@ -16,6 +24,8 @@ import re
 ARGS = Console.get_args({
     "ignore_dirs": {"-i", "--ignore", "--ignore-dirs"},
     "no_progress": {"-n", "-np", "--no-progress"},
+    "watch": {"-w", "--watch"},
+    "benchmark": {"-bm", "--benchmark"},
     "help": {"-h", "--help"},
 })
 DEFAULT = {
@@ -26,6 +36,15 @@ DEFAULT = {
     "indent": 2,
     "into_file": False,
 }
+# THE GENERATED BENCHMARK TREE: NUMBER OF ENTRIES, SUBDIRECTORIES PER DIRECTORY AND (AT LEAST) FILES PER DIRECTORY
+BENCHMARK_ENTRIES = 1_000_000
+BENCHMARK_FANOUT = 20
+BENCHMARK_FILES_PER_DIR = 100
+BENCHMARK_WORDS = (
+    "apple", "bridge", "candle", "desert", "engine", "forest", "garden", "harbor", "island", "jungle", "kettle", "ladder",
+    "marble", "needle", "orange", "pillow", "quartz", "rocket", "silver", "timber", "violet", "window", "yellow", "zipper",
+)
+BENCHMARK_EXTENSIONS = (".py", ".ts", ".md", ".json", ".txt", ".css", ".html", ".yml")
 
 
 def print_help():
@@ -37,10 +56,14 @@ def print_help():
 [b](Options:)
   [br:blue](-i), [br:blue](--ignore-dirs)    Directories to ignore [dim]((abs paths / rel paths / dir names, separated by |))
   [br:blue](-n), [br:blue](--no-progress)    Disable progress display during tree generation
+  [br:blue](-w), [br:blue](--watch)          Keep running and re-render the tree when something changes
+  [br:blue](-bm), [br:blue](--benchmark)     Time the generation with and without progress [dim]((number of entries to generate, or a directory))
 
 [b](Examples:)
   [br:green](x-tree) [br:blue](-i "/abs/to/dir1 | rel/to/dir2 | dir3")    [dim](# [i](Ignore specified directories))
   [br:green](x-tree) [br:blue](--no-progress)                             [dim](# [i](Disable progress display))
+  [br:green](x-tree) [br:blue](--watch)                                   [dim](# [i](Live-update the tree on changes))
+  [br:green](x-tree) [br:blue](--benchmark=1000000)                       [dim](# [i](Benchmark the progress on a generated tree))
 """
     FormatCodes.print(help_text)
 
@@ -60,10 +83,13 @@ class DirScanResult(NamedTuple):
 
 class GenerationStats:
 
-    processed_dirs: int = 0
-    processed_files: int = 0
-    current_depth: int = 0
-    max_depth: int = 0
+    __slots__ = ("processed_dirs", "processed_files", "current_depth", "max_depth")
+
+    def __init__(self):
+        self.processed_dirs: int = 0
+        self.processed_files: int = 0
+        self.current_depth: int = 0
+        self.max_depth: int = 0
 
 
 class IGNORE:
@@ -215,6 +241,115 @@ class IGNORE:
     )
 
 
+class InotifyWatcher:
+    """Directory watcher using the Linux `inotify` API through `ctypes`."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, watch_contents: bool = False, debounce: float = 0.1):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd: int = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._mask = (
+            self.IN_CREATE | self.IN_DELETE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_DELETE_SELF | self.IN_MOVE_SELF
+            | self.IN_ONLYDIR | ((self.IN_MODIFY | self.IN_CLOSE_WRITE) if watch_contents else 0)
+        )
+        self._debounce = debounce
+        self._wd_to_dir: dict[int, str] = {}
+        self._dir_to_wd: dict[str, int] = {}
+
+    def sync(self, dirs: Iterable[str], files: Iterable[str] = ()) -> None:
+        """Watch exactly the given directories. (File changes are reported through their directory's watch.)"""
+        dirs = set(dirs)
+        for dir_path in self._dir_to_wd.keys() - dirs:
+            self._libc.inotify_rm_watch(self._fd, self._dir_to_wd.pop(dir_path))
+        for dir_path in dirs - self._dir_to_wd.keys():
+            if (wd := self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), self._mask)) >= 0:
+                self._dir_to_wd[dir_path] = wd
+                self._wd_to_dir[wd] = dir_path
+
+    def wait(self, timeout: Optional[float] = None) -> set[str]:
+        """Block until something changes and return the directories whose listing (or file contents) changed."""
+        changed: set[str] = set()
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return changed
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                data = b""
+            offset = 0
+            while offset + self._EVENT_HEADER.size <= len(data):
+                wd, mask, _, name_len = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size + name_len
+                if mask & self.IN_Q_OVERFLOW:
+                    changed.update(self._dir_to_wd.keys())
+                elif (dir_path := self._wd_to_dir.get(wd)) is not None:
+                    changed.add(dir_path)
+                    if mask & self.IN_IGNORED:
+                        del self._wd_to_dir[wd]
+                        self._dir_to_wd.pop(dir_path, None)
+            # KEEP COLLECTING UNTIL THE BURST OF EVENTS IS OVER
+            if not select.select([self._fd], [], [], self._debounce)[0]:
+                return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Fallback directory watcher, which compares the modification times of the watched paths."""
+
+    def __init__(self, interval: float = 1.0):
+        self._interval = interval
+        self._mtimes: dict[str, int] = {}
+        self._file_dirs: dict[str, str] = {}
+
+    @staticmethod
+    def _mtime(path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return -1
+
+    def sync(self, dirs: Iterable[str], files: Iterable[str] = ()) -> None:
+        """Watch exactly the given directories and files."""
+        self._file_dirs = {f: os.path.dirname(f) for f in files}
+        paths = set(dirs) | self._file_dirs.keys()
+        self._mtimes = {p: (self._mtimes[p] if p in self._mtimes else self._mtime(p)) for p in paths}
+
+    def wait(self, timeout: Optional[float] = None) -> set[str]:
+        """Block until something changes and return the directories whose listing (or file contents) changed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self._interval)
+            changed: set[str] = set()
+            for path, mtime in self._mtimes.items():
+                if (new_mtime := self._mtime(path)) != mtime:
+                    self._mtimes[path] = new_mtime
+                    changed.add(self._file_dirs.get(path, path))
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        self._mtimes.clear()
+
+
 class Tree:
 
     _NEWLINE = b"\n"
@@ -235,6 +370,7 @@ class Tree:
         style: int = 1,
         indent: int = 2,
         display_progress: Optional[bool] = True,
+        cache_subtrees: Optional[bool] = False,
     ):
         self.base_dir: Path = base_dir.resolve()
         self.ignore_dirs: list[str] = (ignore_dirs or []) + (self.IGNORE_DIRS if auto_ignore else [])
@@ -287,7 +423,10 @@ class Tree:
         self._reset_style_attrs()
         self.gen_stats = GenerationStats()
         self._progress_update_interval = 0.05  # SECONDS BETWEEN UPDATES
-        self._last_progress_update = 0
+        self._progress_dir: Path | str = self.base_dir
+        # RENDERED SUBTREES BY DIRECTORY PATH: (PREFIX, OUTPUT, DIRS, FILES, MAX DEPTH)
+        self._subtree_cache: Optional[dict[str, tuple[str, str, int, int, int]]] = {} if cache_subtrees else None
+        self._content_files: set[str] = set()
 
     def generate(
         self,
@@ -323,7 +462,17 @@ class Tree:
             ) == 0 else frozenset(norm_ignore_dirs)
         )
         self._reset_style_attrs()
-        result = self._gen_tree(self.base_dir)
+        self._progress_dir = self.base_dir
+        stop_progress = threading.Event()
+        progress_thread = threading.Thread(target=self._progress_loop, args=(stop_progress, ), daemon=True)
+        if self.display_progress:
+            progress_thread.start()
+        try:
+            result = self._gen_tree(self.base_dir)
+        finally:
+            stop_progress.set()
+            if progress_thread.is_alive():
+                progress_thread.join()
         Console.done(
             f"[b](Generated tree:) max depth [br:cyan]({self.gen_stats.max_depth}) [dim](|) "
             f"[br:cyan]({self.gen_stats.processed_dirs:,}) dirs [dim](|) [br:cyan]({self.gen_stats.processed_files:,}) files",
@@ -462,19 +611,16 @@ class Tree:
         except Exception:
             return False
 
-    def _update_progress(self, current_dir: Path, is_dir: bool = True) -> None:
+    def _progress_loop(self, stop: threading.Event) -> None:
+        """Display the generation progress until `stop` is set. (Runs in its own thread, so the traversal
+        itself only has to bump the counters in `gen_stats` and set `_progress_dir`.)"""
+        self._render_progress()
+        while not stop.wait(self._progress_update_interval):
+            self._render_progress()
+
+    def _render_progress(self) -> None:
         """Update the generation progress display."""
-        if is_dir:
-            self.gen_stats.processed_dirs += 1
-        else:
-            self.gen_stats.processed_files += 1
-        self.gen_stats.current_depth = len(Path(current_dir).parts) - len(Path(self.base_dir).parts)
-        self.gen_stats.max_depth = max(self.gen_stats.max_depth, self.gen_stats.current_depth)
-        if not self.display_progress:
-            return
-        elif (current_time := time.time()) - self._last_progress_update < self._progress_update_interval:
-            return
-        self._last_progress_update = current_time
+        current_dir = self._progress_dir
         try:
             rel_path = str(Path(current_dir).relative_to(self.base_dir))
         except ValueError:
@@ -494,13 +640,82 @@ class Tree:
             start="\033[F\033[K",
         )
 
+    def _gen_subtree(self, _dir: str, _prefix: str, _level: int, _parent_path: str = "") -> str:
+        """Generate the tree of a subdirectory, reusing its last rendering if it's cached and still valid."""
+        if self._subtree_cache is None:
+            return self._gen_tree(_dir, _prefix, _level, _parent_path)
+        if (cached := self._subtree_cache.get(_dir)) and cached[0] == _prefix:
+            self.gen_stats.processed_dirs += cached[2]
+            self.gen_stats.processed_files += cached[3]
+            self.gen_stats.max_depth = max(self.gen_stats.max_depth, cached[4])
+            return cached[1]
+        dirs_before, files_before, max_depth_before = (
+            self.gen_stats.processed_dirs, self.gen_stats.processed_files, self.gen_stats.max_depth
+        )
+        self.gen_stats.max_depth = 0
+        output = self._gen_tree(_dir, _prefix, _level, _parent_path)
+        self._subtree_cache[_dir] = (
+            _prefix,
+            output,
+            self.gen_stats.processed_dirs - dirs_before,
+            self.gen_stats.processed_files - files_before,
+            self.gen_stats.max_depth,
+        )
+        self.gen_stats.max_depth = max(self.gen_stats.max_depth, max_depth_before)
+        return output
+
+    def _invalidate(self, changed_dirs: Iterable[str]) -> None:
+        """Drop the cached renderings of the changed directories and all their parent directories."""
+        if self._subtree_cache is None:
+            return
+        base_dir = str(self.base_dir)
+        for dir_path in changed_dirs:
+            if not os.path.isdir(dir_path):
+                # THE DIRECTORY IS GONE, SO EVERYTHING CACHED BELOW IT IS TOO
+                sub_prefix = dir_path + os.sep
+                for path in [p for p in self._subtree_cache if p.startswith(sub_prefix)]:
+                    del self._subtree_cache[path]
+                self._content_files = {f for f in self._content_files if not f.startswith(sub_prefix)}
+            while dir_path.startswith(base_dir):
+                self._subtree_cache.pop(dir_path, None)
+                if dir_path == base_dir or (parent := os.path.dirname(dir_path)) == dir_path:
+                    break
+                dir_path = parent
+        self._scan_directory.cache_clear()
+
+    def watch_changes(self, poll_interval: float = 1.0) -> Generator[str, None, None]:
+        """Wait for changes inside the already generated tree and yield the updated tree after each change.
+        Only the branches containing changed directories are re-rendered, everything else comes from cache."""
+        if self._subtree_cache is None:
+            raise ValueError("Watching for changes requires the tree to be created with 'cache_subtrees=True'")
+        try:
+            watcher: InotifyWatcher | PollingWatcher = InotifyWatcher(watch_contents=bool(self.include_file_contents))
+        except (OSError, AttributeError):
+            watcher = PollingWatcher(poll_interval)
+        try:
+            while True:
+                watcher.sync({str(self.base_dir), *self._subtree_cache.keys()}, self._content_files)
+                if not (changed_dirs := watcher.wait()):
+                    continue
+                self._invalidate(changed_dirs)
+                self.gen_stats = GenerationStats()
+                yield self._gen_tree(self.base_dir)
+        finally:
+            watcher.close()
+
     def _gen_tree(self, _dir: Path, _prefix: str = "", _level: int = 0, _parent_path: str = "") -> str:
         """Generate tree for directory.
         _dir: Current directory path
         _prefix: Line prefix for visual tree structure
         _level: Current recursion depth
         _parent_path: Relative path from base_dir to current dir"""
-        self._update_progress(_dir)
+        # ONLY CHEAP COUNTER UPDATES HERE, THE PROGRESS ITSELF IS RENDERED BY THE PROGRESS THREAD
+        stats, file_depth = self.gen_stats, _level + 1
+        stats.processed_dirs += 1
+        stats.current_depth = _level
+        if _level > stats.max_depth:
+            stats.max_depth = _level
+        self._progress_dir = _dir
         result = bytearray()
         try:
             if (_level == 0):
@@ -558,13 +773,17 @@ class Tree:
                         result.extend(self._dirname_end_b)
                         result.extend(self._NEWLINE)
                         new_prefix = _prefix + (" " * self.indent if is_last else self.line_ver + " " * (self.indent - 1))
-                        result.extend(self._gen_tree(entry.path, new_prefix, _level + 1).encode())
+                        result.extend(self._gen_subtree(entry.path, new_prefix, _level + 1).encode())
                     else:
-                        self._update_progress(entry.path, is_dir=False)
+                        stats.processed_files += 1
+                        if file_depth > stats.max_depth:
+                            stats.max_depth = file_depth
                         result.extend(current_prefix)
                         result.extend(entry.name.encode())
                         result.extend(self._NEWLINE)
                         if self.include_file_contents and self._is_text_file(entry.path):
+                            if self._subtree_cache is not None:
+                                self._content_files.add(entry.path)
                             content_prefix = _prefix + (
                                 " " * self.indent if is_last else self.line_ver + " " * (self.indent - 1)
                             )
@@ -623,13 +842,17 @@ class Tree:
                         result.extend(self._dirname_end_b)
                         result.extend(self._NEWLINE)
                         new_prefix = _prefix + (" " * self.indent if is_last else self.line_ver + " " * (self.indent - 1))
-                        result.extend(self._gen_tree(entry.path, new_prefix, _level + 1, current_rel_path).encode())
+                        result.extend(self._gen_subtree(entry.path, new_prefix, _level + 1, current_rel_path).encode())
                     else:
-                        self._update_progress(entry.path, is_dir=False)
+                        stats.processed_files += 1
+                        if file_depth > stats.max_depth:
+                            stats.max_depth = file_depth
                         result.extend(current_prefix)
                         result.extend(entry.name.encode())
                         result.extend(self._NEWLINE)
                         if self.include_file_contents and self._is_text_file(entry.path):
+                            if self._subtree_cache is not None:
+                                self._content_files.add(entry.path)
                             content_prefix = _prefix + (
                                 " " * self.indent if is_last else self.line_ver + " " * (self.indent - 1)
                             )
@@ -667,12 +890,75 @@ class Tree:
         return "" if result is None else bytes(result).decode()
 
 
+def create_benchmark_tree(directory: str, entries: int) -> None:
+    """Fill a directory with `entries` empty files and subdirectories, spread over as many levels
+    of `BENCHMARK_FANOUT` subdirectories as there are files for (at least `BENCHMARK_FILES_PER_DIR` per directory)."""
+    random_gen = random.Random(0)
+    dirs, level_dirs = [directory], [directory]
+    while len(dirs) * BENCHMARK_FANOUT * BENCHMARK_FILES_PER_DIR <= entries:
+        level_dirs = [
+            os.path.join(parent, f"{random_gen.choice(BENCHMARK_WORDS)}-{i}") for parent in level_dirs
+            for i in range(BENCHMARK_FANOUT)
+        ]
+        for dir_path in level_dirs:
+            os.mkdir(dir_path)
+        dirs.extend(level_dirs)
+    # THE FILE NAMES HAVE NO COMMON PREFIX OR SUFFIX AND DON'T LOOK LIKE HASHES, SO NOTHING IS AUTO-IGNORED OR HIDDEN
+    files_per_dir, extra_files = divmod(max(0, entries - len(dirs) + 1), len(dirs))
+    for dir_num, dir_path in enumerate(dirs):
+        for i in range(files_per_dir + (dir_num < extra_files)):
+            first_word, second_word = random_gen.sample(BENCHMARK_WORDS, 2)
+            name = f"{first_word}{second_word.capitalize()}{i}{random_gen.choice(BENCHMARK_EXTENSIONS)}"
+            os.close(os.open(os.path.join(dir_path, name), os.O_CREAT | os.O_WRONLY))
+
+
+def run_benchmark(base_dir: Path, rounds: int = 3) -> None:
+    """Time the tree generation with and without the progress display. The runs alternate between both,
+    so they profit the same from the file system cache, and the best of a few rounds is taken."""
+    FormatCodes.print(f"\nBenchmarking the tree generation of [white]{base_dir}[_]:")
+    best_times, stats = {False: math.inf, True: math.inf}, GenerationStats()
+    for _ in range(rounds):
+        for display_progress in best_times:
+            tree = Tree(base_dir, style=DEFAULT["tree_style"], indent=DEFAULT["indent"], display_progress=display_progress)
+            start_time = time.perf_counter()
+            tree.generate()
+            best_times[display_progress] = min(best_times[display_progress], time.perf_counter() - start_time)
+            stats = tree.gen_stats
+            # CLEAR THE OUTPUT OF `generate()`, SO ONLY THE RESULTS ARE LEFT
+            sys.stdout.write("\033[F\033[K" * 2)
+            sys.stdout.flush()
+    entries = stats.processed_dirs - 1 + stats.processed_files
+    FormatCodes.print(
+        f"  [dim]({stats.processed_dirs - 1:,} dirs and {stats.processed_files:,} files, max depth {stats.max_depth})"
+    )
+    for display_progress, best in best_times.items():
+        FormatCodes.print(
+            f"  [b]({'with progress' if display_progress else 'without progress':<17}) [br:white]({best:>8,.3f} s)"
+            f"  [dim]({entries / best:>10,.0f} entries/s)"
+        )
+    FormatCodes.print(f"  [dim](The progress display costs {(best_times[True] / best_times[False] - 1) * 100:+.1f} %.)\n")
+
+
 def main():
     if ARGS.help.exists:
         print_help()
         return
 
-    tree = Tree(Path.cwd())
+    if ARGS.benchmark.exists:
+        target = str(ARGS.benchmark.values[0]) if ARGS.benchmark.values else str(BENCHMARK_ENTRIES)
+        if target.replace("_", "").isdigit():
+            with tempfile.TemporaryDirectory(prefix="x-tree-benchmark-") as directory:
+                Console.info(f"creating a tree with [br:cyan]({int(target):,}) entries...", start="\n")
+                create_benchmark_tree(directory, int(target))
+                run_benchmark(Path(directory))
+                Console.info("removing the benchmark tree...")
+        elif Path(target).is_dir():
+            run_benchmark(Path(target))
+        else:
+            raise ValueError(f"The benchmark needs a number of entries to generate or a directory, but got {target!r}")
+        return
+
+    tree = Tree(Path.cwd(), cache_subtrees=ARGS.watch.exists)
 
     if ARGS.ignore_dirs.exists:
         ignore_dirs = ARGS.ignore_dirs.values[0].split("|") if ARGS.ignore_dirs.values else []
@@ -714,7 +1000,8 @@ def main():
         output_type=int,
     )
 
-    into_file = Console.input(
+    # IN WATCH MODE THE TREE IS ALWAYS SHOWN IN THE CONSOLE, SINCE A TREE FILE WOULD TRIGGER ITS OWN RE-RENDERS
+    into_file = not ARGS.watch.exists and Console.input(
         f"[b](Output tree into file) {"(Y)" if DEFAULT["into_file"] else "(N)"} [b](>) ",
         max_len=1,
         allowed_chars="yYnN",
@@ -749,6 +1036,19 @@ def main():
         sys.stdout.write(result)
         FormatCodes.print("[_]")
 
+    if ARGS.watch.exists:
+        tree.display_progress = False
+        Console.info("watching for changes... [dim]((Ctrl+C to stop))")
+        for result in tree.watch_changes():
+            Console.cls()
+            FormatCodes.print("[white]")
+            sys.stdout.write(result)
+            FormatCodes.print("[_]")
+            Console.done(
+                f"[b](Updated tree) at [br:cyan]({time.strftime('%H:%M:%S')}) [dim](|) "
+                f"[br:cyan]({tree.gen_stats.processed_dirs:,}) dirs [dim](|) [br:cyan]({tree.gen_stats.processed_files:,}) files"
+            )
+
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,41 @@
+<x-guest.app class="px-0 py-3">
+    <x-slot name="title">
+        {{ __('l.results') }} {{ $race->name }}
+    </x-slot>
+    {{-- A blade comment --}}
+    @php
+        $total = count($items);
+    @endphp
+    <x-typography.heading type="h2" class="mb-2">{{ $lang('l.heading') }}</x-typography.heading>
+    <div class="list" @if($isActive) active @endif>
+        @foreach($race->attendees as $key => $attendee)
+            <x-base.link href="{{ route('attendee', $attendee->id) }}" :label="'Name: ' . $attendee->name">
+                {{ ucfirst($attendee->name) }} ({{ $loop->first ? 'first' : '' }})
+            </x-base.link>
+            @if($attendee->age >= 18 && count($attendee->races) > 2)
+                <span class="adult">{{ strtoupper($attendee->name) }}</span>
+            @elseif(strlen($attendee->name) == 0)
+                <br/>
+            @else
+                <img src="{{ asset('img/kid.png') }}" alt="">
+            @endif
+        @endforeach
+    </div>
+    @isset($sponsor)
+        {!! $sponsor->html !!}
+    @endisset
+    @empty($items)
+        <p>{{ __('l.empty') }}</p>
+    @endempty
+    @for($i = 0; $i < 5; $i++)
+        <x-base.button type="button" :disabled="$i == 3"></x-base.button>
+    @endfor
+    <iconify-icon icon="akar-icons:github-fill"></iconify-icon>
+    @include('partials.footer')
+    <input type="text" value="{{ $input }}" :input="$input" />
+    {{ date($race->date) }} {{ json_encode($data) }}
+</x-guest.app>
+<script>
+    import { lang } from 'some-lib';
+    const title = lang('l.title');
+</script>
@@ -1,8 +1,22 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, cast
+from typing import NamedTuple, Optional, cast
 from xulbux import FormatCodes, EnvPath, FileSys, String, Regex, Code, Data, File, Json
-from xulbux.console import Console, ParsedArgs
+from xulbux.console import Console, ParsedArgs, ProgressBar
 import regex as rx
+import multiprocessing
+import ctypes.util
+import threading
+import hashlib
+import select
+import random
+import ctypes
+import struct
+import queue
+import json
+import math
+import time
+import sys
 import os
 import re
 
@@ -118,19 +132,42 @@ DEFAULT_JSON = {
 }
 L_FN = r"\$lang|__"
 TAB = " " * 17
-ADD_JS = []
-JS_IMPORTS = {}
 QUOTES = Regex.quotes()
 R_BR = Regex.brackets("(", ")", is_group=True)
 S_BR = Regex.brackets("[", "]", is_group=True)
 C_BR = Regex.brackets("{", "}", is_group=True)
 A_BR = Regex.brackets("<", ">", is_group=True)
+TEXT, TAG, ECHO, RAW_ECHO, COMMENT, DIRECTIVE, PHP, SCRIPT = (
+    "text", "tag", "echo", "raw_echo", "comment", "directive", "php", "script"
+)
+EXPRESSION_TOKENS = frozenset({TAG, ECHO, RAW_ECHO, DIRECTIVE, PHP})  # TOKENS WHICH CAN CONTAIN PHP-EXPRESSIONS
+BENCHMARK_LINES = (2_500, 5_000, 10_000)
+BENCHMARK_FILES = 200
+REGEX_TIMEOUT = 2.0  # SECONDS A SINGLE PATTERN MAY TAKE ON ONE PART OF A TEMPLATE, BEFORE ITS RULE IS SKIPPED
+FUZZ_SIZES = (250, 500, 1_000, 2_000)
+FUZZ_FRAGMENTS = (  # PIECES OF (MOSTLY BROKEN) BLADE SYNTAX, WHICH THE RANDOM FUZZING INPUTS ARE BUILT FROM
+    "<div ", "<x-base.button ", "</div>", ">", "/>", "<", " ", "\n", "=", ":attr=", 'attr="', "attr='", '"', "'", "\\", "\\'",
+    '\\"', "`", "{{ ", " }}", "{!! ", " !!}", "{{-- ", "@if(", "@empty(", "@isset(", "@end", "@endif", "@foreach(", " as ",
+    "(", ")", "[", "]", "{", "}", "$var", "->", ".", "count(", "__(", "=>", "$slot", "<script>", "</script>",
+)
+OVERWRITE_POLICIES = ("skip-unchanged", "overwrite", "fail")
+CACHE_FILE = ".x-convert-cache.json"
+CACHE_VERSION = 1  # BUMP THIS WHENEVER THE CACHE FORMAT CHANGES, SO OLD CACHES ARE IGNORED
+WATCH_DEBOUNCE = 0.2  # SECONDS WITHOUT FURTHER CHANGES, AFTER WHICH A BURST OF CHANGES IS CONVERTED
+WATCH_POLL_INTERVAL = 1.0
+STATUS_COLORS = {"converted": "#41B883", "unchanged": "#7B7C8F", "skipped": "#FFAD44", "failed": "#FF5252"}
 
 
 ARGS = Console.get_args({
     "filepath": {"-f", "--file", "-p", "--path", "-fp", "--filepath", "--file-path"},
     "indent": {"-i", "--indent", "-is", "--indent-spaces"},
     "blade_vue": {"-bv", "--blade-vue", "--blade-to-vue"},
+    "directory": {"-dir", "--dir", "--directory"},
+    "output": {"-o", "--out", "--output"},
+    "overwrite": {"flags": {"-ow", "--overwrite"}, "default": "skip-unchanged"},
+    "watch": {"-w", "--watch"},
+    "benchmark": {"-bm", "--benchmark"},
+    "fuzz": {"-fz", "--fuzz"},
     "help": {"-h", "--help"},
     "debug": {"-d", "--debug"},
 })
@@ -154,6 +191,12 @@ def show_help():
     [#77EFEF]-f[dim](,) --file[dim](,) -p[dim](,) --path[dim](,) -fp[dim](,) --filepath[dim](,) --file-path    [#AA90FF]Path to the file containing the code to be formatted[*]
     [#77EFEF]-i[dim](,) --indent[dim](,) -is[dim](,) --indent-spaces                      [#AA90FF]Number of spaces to use for indentation in the formatted file[*]
     [#77EFEF][dim](<)conversion type: args under supported conversions ↓ [dim](>)  [#AA90FF]What type of code to convert into another type of code[*]
+    [#77EFEF]-dir[dim](,) --dir[dim](,) --directory                                [#AA90FF]Convert all [i](.blade.php) files in this directory and its subdirectories[*]
+    [#77EFEF]-o[dim](,) --out[dim](,) --output                                     [#AA90FF]Directory to write the converted files of [#77EFEF]--dir[#AA90FF] into [dim]((default: next to each file))[*]
+    [#77EFEF]-ow[dim](,) --overwrite                                        [#AA90FF]What to do with existing files in [#77EFEF]--dir[#AA90FF] mode: [i](skip-unchanged)[dim](,) [i](overwrite)[dim](,) [i](fail)[*]
+    [#77EFEF]-w[dim](,) --watch                                             [#AA90FF]Keep converting the [i](.blade.php) files in this directory whenever they change[*]
+    [#77EFEF]-bm[dim](,) --benchmark                                        [#AA90FF]Time the conversion of the file repeated up to {BENCHMARK_LINES[-1]:,} lines[*]
+    [#77EFEF]-fz[dim](,) --fuzz                                             [#AA90FF]Search random broken templates [dim]((optional number of rounds)) for patterns that get very slow[*]
 
   [b|#7090FF]Examples [_b]((Blade ➜ Vue)):[*]
     Full path with 2 spaces indentation:
@@ -163,12 +206,23 @@ def show_help():
       [_]C:\Users\{Console.user}> [#FF9E6A]cd [#4DF1C2]D:\full\path[*]
       [_]D:\full\path> [#FF9E6A]x-convert [#7B7C8F]--file-path [#4DF1C2].\to\file.blade.php [#7B7C8F]--indent-spaces [#77EFEF]4 [#7B7C8F]--blade-to-vue[*]
 
+    Whole directory into another directory, overwriting changed files:
+      [_]D:\laravel-app> [#FF9E6A]x-convert [#7B7C8F]-bv --dir=[#4DF1C2]resources\views [#7B7C8F]--out=[#4DF1C2]resources\js\Pages [#7B7C8F]--overwrite=[#77EFEF]overwrite[*]
+
+    Live-update the converted files while editing the Blade files:
+      [_]D:\laravel-app> [#FF9E6A]x-convert [#7B7C8F]-bv --watch=[#4DF1C2]resources\views [#7B7C8F]--out=[#4DF1C2]resources\js\Pages[*]
+
   [b|#7090FF]Supported conversion:[*]
     [b|#FF5252]Laravel Blade [dim]((.blade.php))[*] to [b|#41B883]Vue.js [dim]((.vue))[*]             [*|#AA90FF]-bv[dim](,) --blade-vue[dim](,) --blade-to-vue[*]
   [_]"""
     )
 
 
+def is_batch_mode(args: ParsedArgs) -> bool:
+    # `--dir` AND `--watch` CAN RUN UNATTENDED (E.G. IN A PRE-COMMIT HOOK), SO THEY MUST NEVER WAIT FOR AN ANSWER
+    return bool(args.directory.values or args.watch.values)
+
+
 def get_json(args: ParsedArgs) -> None:
     try:
         global JSON, _JSON
@@ -176,6 +230,14 @@ def get_json(args: ParsedArgs) -> None:
             JSON_FILE, comment_start=">>", comment_end="<<", return_original=True
         )
     except FileNotFoundError:
+        if is_batch_mode(args):
+            Console.fail(
+                f"File not found: [white]{JSON_FILE}[_]\n"
+                f"[#7090FF]Run [#FF9E6A]{COMMAND}[#7090FF] once without [#77EFEF]--dir[#7090FF] or [#77EFEF]--watch[#7090FF] to create it.[_]",
+                pause=DEBUG,
+                start="\n",
+                end="\n\n",
+            )
         Console.fail(f"File not found: [white]{JSON_FILE}", exit=False, start="\n")
         if Console.confirm(f"{TAB}Create [+|b]{JSON_FILE}[*] with default values in program directory?", default_color="#3EE6DE", end=""):
             Json.create(JSON_FILE, DEFAULT_JSON, indent=4, force=True)
@@ -188,9 +250,20 @@ def get_json(args: ParsedArgs) -> None:
 
 
 def get_missing_args(args: ParsedArgs) -> ParsedArgs:
-    if not args.filepath.values or not args.blade_vue.exists:
+    if is_batch_mode(args):
+        if not args.blade_vue.exists:
+            Console.fail(
+                "No conversion chosen. [#7090FF]In [#77EFEF]--dir[#7090FF] and [#77EFEF]--watch[#7090FF] mode it has to be given as an option, "
+                "e.g. [#77EFEF]-bv[#7090FF].[_]",
+                pause=DEBUG,
+                start="\n",
+                end="\n\n",
+            )
+        return args
+    needs_filepath = not args.filepath.values
+    if needs_filepath or not args.blade_vue.exists:
         print()
-    if not args.filepath.values:
+    if needs_filepath:
         args.filepath.values[0] = FormatCodes.input("Path to your file[_|dim] >  [_]", default_color="#3EE6DE").strip()
     if not args.blade_vue.exists:
         FormatCodes.print("What conversion to do?[_]", default_color="#3EE6DE")
@@ -207,10 +280,11 @@ def get_missing_args(args: ParsedArgs) -> ParsedArgs:
     return args
 
 
-def add_to_env_vars() -> None:
+def add_to_env_vars(ask: bool = True) -> None:
     base_dir = FileSys.script_dir
     try:
-        if JSON["is_in_env_vars"] != base_dir:
+        # WITHOUT ASKING, THE QUESTION IS LEFT FOR THE NEXT INTERACTIVE RUN
+        if JSON["is_in_env_vars"] != base_dir and ask:
             if not EnvPath.has_path(base_dir=True):
                 Console.warn(
                     "Path to program-directory doesn't exist in your environment variables.\n"
@@ -239,101 +313,271 @@ def add_to_env_vars() -> None:
         )
 
 
-class blade_to_vue:
-    @staticmethod
-    def transform_slots(code: str) -> Optional[str]:
-        pattern_one_line = (
-            r"<x-slot\s*name\s*=\s*"
-            + QUOTES
-            + r"\s*>\s*\n?\s*([^\n>]+)?\s*\n?\s*</x-slot>"
-        )
-        pattern_multiline = r"<x-slot\s*name\s*=\s*" + QUOTES + r"\s*>(.*?)</x-slot>"
-
-        def replace_slot(match: re.Match) -> Optional[str]:
-            name = match.group(2)
-            content = match.group(3).strip()
-            if not content:
-                return None
-            content = rx.sub(
-                r"\{\{\s*(" + L_FN + r"\(\s*" + QUOTES + r"\s*\))\s*\}\}",
-                r"\1",
-                content,
-            )
-            slots[name] = content
+class BladeToken(NamedTuple):
+    kind: str
+    text: str
+
+
+class BladeLexer:
+    # SPLITS A BLADE TEMPLATE INTO HTML TAGS, `{{ }}` ECHOES, `{!! !!}` RAW ECHOES, `{{-- --}}` COMMENTS,
+    # `@directive(...)`S, `@php` BLOCKS AND THE TEXT IN BETWEEN, IN A SINGLE PASS OVER THE SOURCE
+    START = re.compile(r"\{\{--|\{!!|\{\{|(?<![\w@])@(\w+)|<(/?)([\w.-]+)")
+    RAW_TEXT_START = re.compile(r"\{\{--|\{!!|\{\{|(?<![\w@])@(\w+)")
+    RAW_TEXT_END = {
+        "script": re.compile(r"</script\s*>", re.IGNORECASE),
+        "style": re.compile(r"</style\s*>", re.IGNORECASE),
+    }
+    DELIMITERS = {"{{--": ("--}}", COMMENT), "{!!": ("!!}", RAW_ECHO), "{{": ("}}", ECHO)}
+    ARGS_START = re.compile(r"[ \t]*\(")
+    END_PHP = re.compile(r"@endphp", re.IGNORECASE)
+    TAG_STOP = re.compile(r"""["'>]|\{\{|(?<![\w@])@\w+[ \t]*\(""")
+    PARENS_STOP = re.compile(r"""[()"']""")
+    STRING_END = {
+        '"': re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL),
+        "'": re.compile(r"[^'\\]*(?:\\.[^'\\]*)*'", re.DOTALL),
+    }
+
+    def tokenize(self, code: str) -> list[BladeToken]:
+        tokens: list[BladeToken] = []
+        pos, end = 0, len(code)
+        raw_text_end = -1  # WHILE INSIDE A `<script>` OR `<style>` BODY, ONLY BLADE SYNTAX IS LEXED UP TO HERE
+        while pos < end:
+            in_raw_text = pos < raw_text_end
+            limit = raw_text_end if in_raw_text else end
+            text_kind = SCRIPT if in_raw_text else TEXT
+            if not (match := (self.RAW_TEXT_START if in_raw_text else self.START).search(code, pos, limit)):
+                tokens.append(BladeToken(text_kind, code[pos:limit]))
+                pos = limit
+                continue
+            start = match.start()
+            if start > pos:
+                tokens.append(BladeToken(text_kind, code[pos:start]))
+            if (opener := match.group()) in self.DELIMITERS:
+                closer, kind = self.DELIMITERS[opener]
+                if (close := code.find(closer, match.end())) < 0:  # UNCLOSED, SO IT'S JUST TEXT
+                    tokens.append(BladeToken(text_kind, opener))
+                    pos = match.end()
+                    continue
+                pos = close + len(closer)
+            elif match.group(1):
+                kind, pos = self.directive_end(code, match)
+            else:
+                kind, pos = TAG, self.tag_end(code, match.end())
+                tag_name = match.group(3).lower()
+                if not match.group(2) and tag_name in self.RAW_TEXT_END and not code.endswith("/>", start, pos):
+                    raw_text_close = self.RAW_TEXT_END[tag_name].search(code, pos)
+                    raw_text_end = raw_text_close.start() if raw_text_close else end
+            tokens.append(BladeToken(kind, code[start:pos]))
+        return tokens
+
+    def directive_end(self, code: str, match: re.Match) -> tuple[str, int]:
+        name_end = match.end()
+        args = self.ARGS_START.match(code, name_end)
+        if not args and match.group(1).lower() == "php" and (end_php := self.END_PHP.search(code, name_end)):
+            return PHP, end_php.end()
+        if args and (args_end := self.parens_end(code, args.end() - 1)) >= 0:
+            return DIRECTIVE, args_end
+        return DIRECTIVE, name_end
 
-        slots = {}
-        code = rx.sub(pattern_one_line, replace_slot, code, flags=re.DOTALL)  # type: ignore[overloads]
+    def tag_end(self, code: str, pos: int) -> int:
+        while match := self.TAG_STOP.search(code, pos):
+            stop, pos = match.group(), match.end()
+            if stop == ">":
+                return pos
+            if stop in "\"'":
+                if (close := code.find(stop, pos)) >= 0:
+                    pos = close + 1
+            elif stop == "{{":
+                if (close := code.find("}}", pos)) >= 0:
+                    pos = close + 2
+            elif (args_end := self.parens_end(code, pos - 1)) >= 0:
+                pos = args_end
+        return len(code)
+
+    def parens_end(self, code: str, pos: int) -> int:  # POSITION AFTER THE BRACKET CLOSING THE ONE AT `pos` OR `-1`
+        depth = 0
+        while match := self.PARENS_STOP.search(code, pos):
+            char, pos = match.group(), match.end()
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if not depth:
+                    return pos
+            elif string_end := self.STRING_END[char].match(code, pos):
+                pos = string_end.end()
+            else:
+                return -1
+        return -1
 
-        def add_slot_attributes(match: re.Match) -> str:
-            tag = match.group(1)
-            attributes = match.group(2).strip()
-            for name, value in slots.items():
-                val = value.strip()
-                attributes += f'{f' {':' if Code.is_js(val) else ''}{name}="{val}"' if val and not('\n' in val or '>' in val) else ''}'
-            return f"<{tag} {attributes.strip()}>{match.group(3)}"
 
-        code = rx.sub(
-            pattern_multiline, r"<template #\2>\3</template>", code, flags=re.DOTALL
+class blade_to_vue:
+    # ALL PATTERNS ARE COMPILED ONCE AT IMPORT, SO CONVERTING MANY FILES IN ONE PROCESS DOESN'T PAY FOR THEM PER FILE
+    SCRIPT_LANG_CALL = re.compile(r"lang\s*\(")
+    SCRIPT_LANG_IMPORT = rx.compile(r"import\s*{\s*lang\s*}\s*from\s*" + QUOTES + r";\s*", rx.DOTALL)
+    TAG_NAME = rx.compile(r"<(/?)([\w.-]+)\s*([^>]*?)(\s*/?)>")
+    TAG_NAME_START = re.compile(r"</?([\w.-]+)")
+    CALL_NAME = re.compile(r"(?<!\w)(\w+)\s*\(")
+    LANG_ATTRIBUTE = rx.compile(r':?([\w-]+)\s*=\s*([\'"])(?:\s*\{\{)?\s*' + L_FN + r"\s*" + R_BR + r"\s*(?:\}\}\s*)?\2")
+    FUNC_CALL = rx.compile(r"(?i)" + Regex.func_call())
+    HEADING_STARTS = (
+        rx.compile(r'<x-typography\.heading\s+(.*?):?type="\'?(.*?)\'?"(.*?)>', rx.DOTALL),
+        rx.compile(r'<x-typography\.heading\s+(.*?):?type=\'"?(.*?)"?\'(.*?)>', rx.DOTALL),
+    )
+    HEADING_END = re.compile(r"</x-typography\.heading\s*>")
+    LOOP = rx.compile(r"(?i)@for(?:each)?\s*" + R_BR)
+    FOR_LOOP = rx.compile(r"\$([\w_]+)\s*=\s*(\S+)\s*;\s*\$\1\s*([<>=!]+)\s*(\S+)\s*;\s*\$\1([\+\-]+)")
+    FOREACH_AS = rx.compile(r"(?i)\s+as\s*")
+    CONCATENATION = rx.compile(
+        r"""(?<!\w)((?:'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`(?:[^`\\]|\\.)*`|\$[\w_]*(?:->[\w]+)*(?:\[[^\]]+\])*)
+                          (?:\s*\.\s*(?:'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`(?:[^`\\]|\\.)*`|\$[\w_]*(?:->[\w]+)*(?:\[[^\]]+\])*))+)""",
+        rx.VERBOSE,
+    )
+    CONCATENATION_PART = rx.compile(
+        r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`(?:[^`\\]|\\.)*`|\$[\w_]*(?:->[\w]+)*(?:\[[^\]]+\])*)|\s*\.\s*""",
+        rx.VERBOSE,
+    )
+    QUOTED = re.compile(r'^[\'"`].*[\'"`]$')
+    SELF_CLOSING_TAG = rx.compile(r"<(/?)([\w.-]+)\s*(" + Regex.all_except(r"<|>") + r")\s*/>", rx.DOTALL)
+    OPENING_TAG = rx.compile(r"<()([\w.-]+)\s*(.*?)(?<!/)>", rx.DOTALL)
+    CLOSING_TAG = re.compile(r"</([\w.-]+)\s*>")
+    DIRECTIVE_CALL = re.compile(r"@(\w+)[ \t]*(?:\((.*)\))?", re.DOTALL)
+    ATTRIBUTE_DIRECTIVES = {  # `<div @if(  ) attr>` AND THE LIKE
+        name: rx.compile(
+            r"(?i)(<(?!/)[\w.-]+" + Regex.all_except(r"<|>|@" + name) + r")@" + name + r"\s*"
+            + R_BR + r"((?:\s+[\w-]+)?)(" + Regex.all_except(r"<|>") + r">)",
+            rx.DOTALL,
         )
-        code = re.sub(r"<(/)?x-slot(.*?)>", r"<\1slot\2>", code)
-        return re.sub(
-            r"<([\w.-]+)(.*?)>(\s*(?:\n|<[\w.-]+\s+|$))",
-            add_slot_attributes,
-            code,
-            count=1,
+        for name in ("if", "empty", "isset", "is_null")
+    }
+    ATTRIBUTE_END_DIRECTIVE = rx.compile(
+        r"(?i)(<(?!/)[\w.-]+" + Regex.all_except(r"<|>|@end(?:[\w_]+)") + r")@end([\w_]+)(" + Regex.all_except(r"<|>") + r">)",
+        rx.DOTALL,
+    )
+    SLOT_ECHO = re.compile(r"{{\s*\$slot\s*}}")
+    DIV_START = re.compile(r"<div\s*>")
+    DIV_END = re.compile(r"</div\s*>")
+    CONDITIONAL_SLOT_START = re.compile(r'<[\w-]+\s+v-if\s*=\s*"\s*\$?slot\s*"\s*>$')
+    CONDITIONAL_SLOT = rx.compile(
+        r'<([\w-]+)\s+v-if\s*=\s*"\s*\$?slot\s*"\s*>\s*<slot(?:\s+name\s*=\s*'
+        + QUOTES
+        + r")?\s*>\s*{{\s*\$?slot\s*}}\s*</slot\s*>\s*</\1\s*>"
+    )
+    SCRIPT_START = re.compile(r"<script(?:\s|>)", re.IGNORECASE)
+    SCRIPT_END = re.compile(r"</script\s*>", re.IGNORECASE)
+    SCRIPT_BLOCK = rx.compile(
+        r"<script(\s+[\s\S]*)?>" + Regex.all_except(r"<\/script\s*>", is_group=True) + r"<\/script\s*>\s*(?=\s*$)",
+        rx.DOTALL,
+    )
+    # PATTERNS OF THE SINGLE STEPS IN `convert()`
+    COUNT_METHOD = rx.compile(r"(?i)([\w.-]*\s*[)\]}]?)\s*->\s*count\s*" + R_BR)
+    COUNT_FUNC = rx.compile(r"(?i)(?:count|strlen)\s*" + R_BR)
+    MERGED_ATTRIBUTES = rx.compile(
+        r"<([\w.-]+)\s+\{\{\s*(\$[\w_]+)\s*->\s*merge\s*\(\s*" + S_BR + r"\s*\)\s*\}\}(.*?)/?>(\s*(?:\n|<[\w.-]+\s+|$))"
+    )
+    MERGED_ATTRIBUTE = rx.compile(r",?\s*(.*)\s*=>\s*(.*)")
+    ARROW_CHAIN = rx.compile(r"([\w.-]*\s*[)\]}]?)\s*->\s*(?=\w\s*(\(.*?\))?)")
+    LINE_BREAK_TAG = re.compile(r"<br\s*/>")
+    KEY_VARIABLE = re.compile(r"\$(key|index)(?!\s*\()")
+    LOOP_FIRST = rx.compile(r"\s*loop\.first\s*")
+    LOOP_LAST = rx.compile(r"\s*loop\.last\s*")
+    EQUALS = re.compile(r"(?<=[^!<>=\s])\s*([!=])=\s*(?=[^=\s])")
+    EMPTY_ATTRIBUTE = rx.compile(r'(?<![\w$])(\s*:?([\w-]+)\s*=\s*([\'"]))\3')
+    INIT_ERRORS_ATTRIBUTE = rx.compile(r"\s*:\s*init-errors\s*=\s*" + QUOTES + r"(\s*(?:\n|$))")
+    PHP_START = re.compile(r"(?i)(@php)")
+    PHP_END = rx.compile(r"(?i)\s*@endphp")
+    ROUTE_IMPORT = rx.compile(r"import\s*{\s*route\s*}\s*from\s*" + QUOTES + r"\s*;")
+    LANG_CALL = rx.compile(L_FN + r"\s*\((.*?\))")
+    RAW_ECHO_CONTENT = rx.compile(r"{!!\s*(.*?)\s*!!}")
+    SAME_NAME_BINDING = re.compile(r':([\w-]+)\s*=\s*([\'"])\s*\$?\1\s*\2')
+    ATTRIBUTE = rx.compile(r":?([\w-]+)\s*=\s*" + QUOTES)
+    ECHO_ATTRIBUTE = rx.compile(r':?([\w-]+)\s*=\s*([\'"])\s*\{' + C_BR + r"\}\s*\2")
+    CONCATENATED_ATTRIBUTE = rx.compile(r':?([\w-]+)\s*=\s*([\'"])(((?:\\.|(?!\2).)*)\{' + C_BR + r"\}((?:\\.|(?!\2).)*))\2")
+    ASSET_CALL = rx.compile(r"(?i)asset\s*" + R_BR)
+    ISSET_CALL = rx.compile(r"(?i)isset\s*" + R_BR)
+    VUE_ATTRIBUTE = rx.compile(r":v-([\w-]+)\s*=\s*" + QUOTES)
+    QUOTED_ATTRIBUTE = rx.compile(r':?([\w-]+)\s*=\s*([\'"])\s*((?:\\\2|(?:(?!\2)[\'"]))+)((?:\\.|(?!\2).)*)\3\s*\2')
+    ATTRIBUTES_INPUT = rx.compile(r"\$attributes\s*\[\s*" + QUOTES + r"\s*\]")
+    VARIABLE_PREFIX = re.compile(r"\$(\w+)(?!\s*\()")
+
+    def __init__(self, config: dict, debug: bool = False, regex_timeout: Optional[float] = REGEX_TIMEOUT):
+        self.component_replacements: dict = config["component_replacements"]
+        self.php_as_js_functions: dict = config["php_as_js_functions"]
+        self.function_replacements: dict = config["function_replacements"]
+        self.debug = debug
+        self.regex_timeout = regex_timeout
+        self.warnings: list[str] = []  # THE RULES SKIPPED DURING THE LAST CONVERSION
+
+    def skip_rule(self, rule, text: str) -> None:
+        # A PATTERN OF THE RULE TOOK LONGER THAN `regex_timeout` (MOST LIKELY CATASTROPHIC BACKTRACKING ON A MALFORMED
+        # TEMPLATE), SO THE RULE IS SKIPPED FOR THIS PART OF THE TEMPLATE INSTEAD OF HANGING THE WHOLE CONVERSION
+        name = rule if isinstance(rule, str) else getattr(rule, "__name__", str(rule))
+        if name == "<lambda>":  # NAME A LAMBDA AFTER THE PATTERNS IT USES
+            name = ", ".join(name for name in rule.__code__.co_names if name.isupper()) or name
+        self.warnings.append(
+            f"Skipped {name} on a {len(text):,} characters long part of the template, since it took longer than {self.regex_timeout:g} s."
         )
 
+    def guarded_fullmatch(self, pattern: rx.Pattern, text: str, rule: str) -> Optional[rx.Match]:
+        # FOR PATTERNS USED OUTSIDE OF `visit()`, A TIMEOUT SKIPS THE RULE FOR THIS TEXT AS IF THE PATTERN DIDN'T MATCH
+        try:
+            return pattern.fullmatch(text, timeout=self.regex_timeout)
+        except TimeoutError:
+            self.skip_rule(rule, text)
+            return None
+
+    def visit(self, tokens: list[BladeToken], kinds: set | frozenset, visitor, into: Optional[str] = None) -> list[BladeToken]:
+        # APPLY `visitor` TO THE TEXT OF ALL TOKENS OF THE GIVEN KINDS (CHANGED TOKENS BECOME OF KIND `into`, IF GIVEN)
+        visited = []
+        for token in tokens:
+            if token.kind in kinds:
+                try:
+                    if (text := visitor(token.text)) != token.text:
+                        token = BladeToken(into or token.kind, text)
+                except TimeoutError:
+                    self.skip_rule(visitor, token.text)
+            visited.append(token)
+        return visited
+
     @staticmethod
-    def add_php_funcs(code: str, php_as_js_functions: dict) -> None:
+    def is_blank(token: BladeToken) -> bool:
+        return token.kind in (TEXT, SCRIPT) and not token.text.strip()
+
+    def add_php_funcs(self, code: str, js_imports: dict, add_js: list) -> None:
         for php_func in Data.remove_duplicates(
             [func[0] for func in Code.get_func_calls(code)]
         ):
-            if php_func in php_as_js_functions.keys():
-                js_func = php_as_js_functions[php_func]
+            if php_func in self.php_as_js_functions.keys():
+                js_func = self.php_as_js_functions[php_func]
                 if (
                     isinstance(js_func, list)
                     and js_func[1]
                     and js_func[1] not in ("", [], None)
                     and len(js_func[1]) == 2
-                    and js_func[1][0] not in JS_IMPORTS
+                    and js_func[1][0] not in js_imports
                 ):
-                    JS_IMPORTS[js_func[1][0]] = js_func[1][1]
+                    js_imports[js_func[1][0]] = js_func[1][1]
                 js_func = js_func if not isinstance(js_func, list) else js_func[0]
-                if js_func and js_func not in (None, "") and js_func not in ADD_JS:
-                    ADD_JS.append(js_func)
-
-    @staticmethod
-    def transform_script_lang_funcs(code: str) -> str:
-        pattern = (
-            r"(<script(?:\s+[\s\S]*)?>)"
-            + Regex.all_except(r"<|>", is_group=True)
-            + r"(<\/script\s*>)"
-        )
-
-        def replace_script_lang_func(match: re.Match) -> str:
-            script = match.group(2)
-            funcs = re.findall(r"lang\s*\(", script)
-            if funcs:
-                script = re.sub(r"lang\s*\(", "trans(", script)
-                script = rx.sub(
-                    r"import\s*{\s*lang\s*}\s*from\s*" + QUOTES + r";\s*",
-                    "",
-                    script,
-                    flags=re.DOTALL,
-                )
-                JS_IMPORTS["{ trans }"] = "laravel-vue-i18n"
-            return f"{match.group(1)}{script}{match.group(3)}"
+                if js_func and js_func not in (None, "") and js_func not in add_js:
+                    add_js.append(js_func)
 
-        return re.sub(pattern, replace_script_lang_func, code, flags=re.DOTALL)
+    def transform_script_lang_funcs(self, script: str, js_imports: dict) -> str:
+        funcs = self.SCRIPT_LANG_CALL.findall(script)
+        if funcs:
+            script = self.SCRIPT_LANG_CALL.sub("trans(", script)
+            script = self.SCRIPT_LANG_IMPORT.sub("", script, timeout=self.regex_timeout)
+            js_imports["{ trans }"] = "laravel-vue-i18n"
+        return script
 
-    @staticmethod
-    def transform_tag_names(code: str, component_replacements: dict) -> str:
-        pattern = r"<(/?)([\w.-]+)\s*([^>]*?)(\s*/?)>"
+    def transform_tag_names(self, code: str, js_imports: dict) -> str:
+        # ONLY ONE SCAN OVER THE TAG NAMES WITH A DICT LOOKUP EACH, SO THE NUMBER OF REPLACEMENTS DOESN'T MATTER
+        if self.component_replacements.keys().isdisjoint(self.TAG_NAME_START.findall(code)):
+            return code
 
         def replace_tag_name(match: re.Match) -> str:
             tag_parts = [match.group(1), match.group(2), match.group(3)]
-            if tag_parts[1] in component_replacements.keys():
-                value = component_replacements[tag_parts[1]]
+            if tag_parts[1] in self.component_replacements.keys():
+                value = self.component_replacements[tag_parts[1]]
                 replacement_name, import_path = (
                     value if isinstance(value, list) else [value, None]
                 )[:2]
@@ -341,65 +585,58 @@ class blade_to_vue:
                     replacement_name = replacement_name.replace(
                         ":filename", Path(import_path).stem
                     )
-                    if import_path not in JS_IMPORTS:
-                        JS_IMPORTS[replacement_name] = import_path
+                    if import_path not in js_imports:
+                        js_imports[replacement_name] = import_path
                 if tag_parts[2]:
-                    tag_parts[2] = rx.sub(
-                        r':?([\w-]+)\s*=\s*([\'"])(?:\s*\{\{)?\s*'
-                        + L_FN
-                        + r"\s*"
-                        + R_BR
-                        + r"\s*(?:\}\}\s*)?\2",
-                        r'\1="\3"',
-                        tag_parts[2],
-                    )
+                    tag_parts[2] = self.LANG_ATTRIBUTE.sub(r'\1="\3"', tag_parts[2], timeout=self.regex_timeout)
                 return f"<{tag_parts[0]}{replacement_name}{' ' if tag_parts[2] else ''}{tag_parts[2]}{match.group(4)}>"
             return match.group(0)
 
-        code = re.sub(pattern, replace_tag_name, code)
+        code = self.TAG_NAME.sub(replace_tag_name, code, timeout=self.regex_timeout)
         return code
 
-    @staticmethod
-    def transform_func_names(code: str, function_replacements: dict) -> str:
+    def transform_func_names(self, code: str) -> str:
+        # THE FUNCTION CALLS ARE ONLY MATCHED (WITH THEIR NESTED BRACKETS) IF ONE OF THEM IS REPLACED AT ALL
+        if self.function_replacements.keys().isdisjoint(self.CALL_NAME.findall(code)):
+            return code
+
         def replace_func_name(match: re.Match) -> str:
             func_parts = [match.group(1), match.group(2)]
-            if func_parts[0] in function_replacements.keys():
-                return f"{function_replacements[func_parts[0]]}({func_parts[1]})"
+            if func_parts[0] in self.function_replacements.keys():
+                return f"{self.function_replacements[func_parts[0]]}({func_parts[1]})"
             return match.group(0)
 
-        code = rx.sub(r"(?i)" + Regex.func_call(), replace_func_name, code)  # type: ignore[overloads]
+        code = self.FUNC_CALL.sub(replace_func_name, code, timeout=self.regex_timeout)
         return code
 
-    @staticmethod
-    def transform_headings(code: str) -> str:
-        pattern_one = r'<x-typography\.heading\s+(.*?):?type="\'?(.*?)\'?"(.*?)>(.*?)</x-typography\.heading\s*>'
-        pattern_two = r'<x-typography\.heading\s+(.*?):?type=\'"?(.*?)"?\'(.*?)>(.*?)</x-typography\.heading\s*>'
-
-        def replace_heading(match: re.Match) -> str:
+    def transform_headings(self, tokens: list[BladeToken]) -> list[BladeToken]:
+        tokens = list(tokens)
+        for i, token in enumerate(tokens):
+            if token.kind != TAG or not (
+                match := self.guarded_fullmatch(self.HEADING_STARTS[0], token.text, "HEADING_STARTS")
+                or self.guarded_fullmatch(self.HEADING_STARTS[1], token.text, "HEADING_STARTS")
+            ):
+                continue
+            end = next((j for j in range(i + 1, len(tokens)) if tokens[j].kind == TAG and self.HEADING_END.fullmatch(tokens[j].text)), None)
+            if end is None:
+                continue
             heading = match.group(2)
             attributes = f"{match.group(1).strip()} {match.group(3).strip()}".strip()
-            tag_content = match.group(4)
             html_tag = (
                 heading if heading in ("h1", "h2", "h3", "h4", "h5", "h6") else "h1"
             )
-            return f"<{html_tag} {attributes}>{tag_content}</{html_tag}>".strip()
+            tokens[i] = BladeToken(TAG, f"<{html_tag} {attributes}>")
+            tokens[end] = BladeToken(TAG, f"</{html_tag}>")
+        return tokens
 
-        code = re.sub(pattern_one, replace_heading, code, flags=re.DOTALL)
-        code = re.sub(pattern_two, replace_heading, code, flags=re.DOTALL)
-        return code
-
-    @staticmethod
-    def transform_loops(code: str) -> str:
+    def transform_loops(self, code: str) -> str:
         def replace_loop(match: re.Match) -> str:
             loop_content = match.group(1).strip()
-            for_match = re.match(
-                r"\$([\w_]+)\s*=\s*(\S+)\s*;\s*\$\1\s*([<>=!]+)\s*(\S+)\s*;\s*\$\1([\+\-]+)",
-                loop_content,
-            )
+            for_match = self.FOR_LOOP.match(loop_content, timeout=self.regex_timeout)
             if for_match:
                 var, start, _, end, _ = for_match.groups()
                 return f'<div v-for="{var} in Array.from({{length: {end} - {start} + 1}}, (_, i) => i + {start})" :key="{var}">'
-            parts = [part.strip() for part in re.split(r"(?i)\s+as\s*", loop_content)]
+            parts = [part.strip() for part in self.FOREACH_AS.split(loop_content, timeout=self.regex_timeout)]
             if len(parts) == 2:
                 items, item = parts
                 if "=>" in item:
@@ -415,24 +652,19 @@ class blade_to_vue:
                     )
             return match.group(0)
 
-        code = rx.sub(r"(?i)@for(?:each)?\s*" + R_BR, replace_loop, code)  # type: ignore[overloads]
+        code = self.LOOP.sub(replace_loop, code, timeout=self.regex_timeout)
         return code
 
-    @staticmethod
-    def transform_concatenated(code: str) -> str:
-        concat_code_regex = r"""(?<!\w)((?:'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`(?:[^`\\]|\\.)*`|\$[\w_]*(?:->[\w]+)*(?:\[[^\]]+\])*)
-                          (?:\s*\.\s*(?:'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`(?:[^`\\]|\\.)*`|\$[\w_]*(?:->[\w]+)*(?:\[[^\]]+\])*))+)"""
-        split_concat_regex = r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`(?:[^`\\]|\\.)*`|\$[\w_]*(?:->[\w]+)*(?:\[[^\]]+\])*)|\s*\.\s*"""
-
+    def transform_concatenated(self, code: str) -> str:
         def is_quoted(s: str) -> Optional[re.Match]:
-            return re.match(r'^[\'"`].*[\'"`]$', s.strip())
+            return self.QUOTED.match(s.strip())
 
-        matches = list(rx.compile(concat_code_regex, rx.VERBOSE).finditer(code))
+        matches = list(self.CONCATENATION.finditer(code, timeout=self.regex_timeout))
         if matches:
             for match in matches:
                 concat_str = match.group(1)
                 parts = cast(list, Data.remove_empty_items(
-                    rx.compile(split_concat_regex, rx.VERBOSE).findall(concat_str)
+                    self.CONCATENATION_PART.findall(concat_str, timeout=self.regex_timeout)
                 ))
                 if any(char in item for item in parts for char in ('"', "'", "`")):
                     is_str, transformed = 0, ""
@@ -466,9 +698,9 @@ class blade_to_vue:
                 code = code.replace(concat_str, transformed)
         return code
 
-    @staticmethod
     def transform_self_closing_tags(
-        code: str,
+        self,
+        tokens: list[BladeToken],
         disallowed_tags: list = [
             "area",
             "base",
@@ -485,7 +717,7 @@ class blade_to_vue:
             "track",
             "wbr",
         ],
-    ) -> str:
+    ) -> list[BladeToken]:
         def replace_self_closing_tag(match: re.Match) -> str:
             tag = match.group(2)
             if tag in disallowed_tags:
@@ -496,30 +728,164 @@ class blade_to_vue:
                 else f"<{tag} {match.group(3).strip()} />"
             )
 
-        code = re.sub(  # CORRECT ALREADY PRESENT, BUT FORBIDDEN SELF-CLOSING TAGS
-            r"<(/?)([\w.-]+)\s*(" + Regex.all_except(r"<|>") + r")\s*/>",
-            replace_self_closing_tag,
+        tokens = self.visit(tokens, {TAG}, lambda code: self.SELF_CLOSING_TAG.sub(  # CORRECT ALREADY PRESENT, BUT FORBIDDEN SELF-CLOSING TAGS
+            replace_self_closing_tag, code, timeout=self.regex_timeout
+        ))
+        transformed = []  # TURN `<tag ...></tag>` WITH NOTHING BUT WHITESPACE IN BETWEEN INTO SELF-CLOSING TAGS
+        i = 0
+        while i < len(tokens):
+            token, end = tokens[i], i + 1
+            if token.kind == TAG and (match := self.guarded_fullmatch(self.OPENING_TAG, token.text, "OPENING_TAG")):
+                if end < len(tokens) and self.is_blank(tokens[end]):
+                    end += 1
+                if (
+                    end < len(tokens) and tokens[end].kind == TAG
+                    and (closing := self.CLOSING_TAG.fullmatch(tokens[end].text)) and closing.group(1) == match.group(2)
+                ):
+                    transformed.append(BladeToken(TAG, replace_self_closing_tag(match)))
+                    i = end + 1
+                    continue
+            transformed.append(token)
+            i += 1
+        return transformed
+
+    def transform_directives(self, code: str) -> str:
+        match = cast(re.Match, self.DIRECTIVE_CALL.match(code))
+        name, args = match.group(1).lower(), match.group(2)
+        if args is not None and name in ("if", "empty", "isset", "is_null", "elseif"):
+            return {  # REPLACE `@if(  )`, `@empty(  )`, `@isset(  )`, `@is_null(  )` AND `@elseif(  )` SYNTAX WITH `<span v-if="  ">` TAGS
+                "if": f'<span v-if="{args}">',
+                "empty": f'<span v-if="!({args})">',
+                "isset": f'<span v-if="({args}) !== undefined">',
+                "is_null": f'<span v-if="({args}) === null">',
+                "elseif": f'</span><span v-else-if="{args}">',
+            }[name]
+        if name == "else":  # REPLACE `@else` SYNTAX WITH `</span><span v-else>` TAGS
+            return "</span><span v-else>"
+        if name.startswith("end") and len(name) > 3:  # REPLACE `@end...` SYNTAX WITH `</div>` or `</span>` END-TAGS
+            return "</span>" if name[3:] in ("if", "isset", "elseif", "else") else "</div>"
+        return code
+
+    def transform_attribute_directives(self, code: str) -> str:
+        if "@" not in code:
+            return code
+        code = self.ATTRIBUTE_DIRECTIVES["if"].sub(  # REPLACE `<div @if(true) attr>` SYNTAX WITH `<div :attr="true">` ATTRIBUTES
+            lambda m: (
+                f'{m.group(1)}:{m.group(3).strip()}="{m.group(2).strip()}"{m.group(4)}'
+                if m.group(3).strip()
+                else m.group(0)
+            ),
+            code,
+            timeout=self.regex_timeout,
+        )
+        code = self.ATTRIBUTE_DIRECTIVES["empty"].sub(  # REPLACE `<div @empty(var) attr>` SYNTAX WITH `<div :attr="!var">` ATTRIBUTES
+            lambda m: (
+                f'{m.group(1)}:{m.group(3).strip()}="!({m.group(2).strip()})"{m.group(4)}'
+                if m.group(3).strip()
+                else m.group(0)
+            ),
+            code,
+            timeout=self.regex_timeout,
+        )
+        code = self.ATTRIBUTE_DIRECTIVES["isset"].sub(  # REPLACE `<div @isset(var) attr>` SYNTAX WITH `<div :attr="(var) !== undefined">` ATTRIBUTES
+            lambda m: (
+                f'{m.group(1)}:{m.group(3).strip()}="({m.group(2).strip()}) !== undefined"{m.group(4)}'
+                if m.group(3).strip()
+                else m.group(0)
+            ),
             code,
-            flags=re.DOTALL,
+            timeout=self.regex_timeout,
         )
-        return re.sub(
-            r"<(/?)([\w.-]+)\s*(" + Regex.all_except(r"<|>") + r")>\s*</\2\s*>",
-            replace_self_closing_tag,
+        code = self.ATTRIBUTE_DIRECTIVES["is_null"].sub(  # REPLACE `<div @is_null(var) attr>` SYNTAX WITH `<div :attr="(var) === null">` ATTRIBUTES
+            lambda m: (
+                f'{m.group(1)}:{m.group(3).strip()}="({m.group(2).strip()}) === null"{m.group(4)}'
+                if m.group(3).strip()
+                else m.group(0)
+            ),
             code,
-            flags=re.DOTALL,
+            timeout=self.regex_timeout,
         )
+        return self.ATTRIBUTE_END_DIRECTIVE.sub(r"\1\3", code, timeout=self.regex_timeout)  # REMOVE `@end...` SYNTAX INSIDE TAG-ATTRIBUTES
+
+    def transform_slot_echoes(self, tokens: list[BladeToken]) -> list[BladeToken]:
+        # REPLACE `{{ $slot }}` (AND A `<div>` DIRECTLY AROUND IT) WITH `<slot />`
+        transformed: list[BladeToken] = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            i += 1
+            if token.kind != ECHO or not self.SLOT_ECHO.fullmatch(token.text):
+                transformed.append(token)
+                continue
+            before = len(transformed) - 1
+            if before >= 0 and self.is_blank(transformed[before]):
+                before -= 1
+            if before >= 0 and transformed[before].kind == TAG and self.DIV_START.fullmatch(transformed[before].text):
+                del transformed[before:]
+            after = i
+            if after < len(tokens) and self.is_blank(tokens[after]):
+                after += 1
+            if after < len(tokens) and tokens[after].kind == TAG and self.DIV_END.fullmatch(tokens[after].text):
+                i = after + 1
+            transformed.append(BladeToken(TAG, "<slot />"))
+        return transformed
+
+    def transform_conditional_slots(self, tokens: list[BladeToken], max_tokens: int = 9) -> list[BladeToken]:
+        # REPLACE `<div v-if="$slot"><slot name="...">{{ $slot }}</slot></div>` WITH `<slot />` OR `<slot name="..." />`
+        transformed: list[BladeToken] = []
+        i = 0
+        while i < len(tokens):
+            if tokens[i].kind == TAG and self.CONDITIONAL_SLOT_START.match(tokens[i].text):
+                code, match = tokens[i].text, None
+                for end in range(i + 1, min(i + max_tokens, len(tokens))):
+                    code += tokens[end].text
+                    try:
+                        match = self.CONDITIONAL_SLOT.fullmatch(code, timeout=self.regex_timeout)
+                    except TimeoutError:
+                        self.skip_rule("CONDITIONAL_SLOT", code)
+                        break
+                    if match:
+                        transformed.append(BladeToken(TAG, f'<slot{f' name="{match.group(3).strip()}"' if match.group(3).strip() else ''} />'))
+                        i = end + 1
+                        break
+                if not match:
+                    transformed.append(tokens[i])
+                    i += 1
+                continue
+            transformed.append(tokens[i])
+            i += 1
+        return transformed
 
     @staticmethod
-    def update_js(code: str, imports: dict, add_js: list, indent: Optional[int] = None) -> str:
+    def comment_out_directives(tokens: list[BladeToken]) -> list[BladeToken]:
+        # COMMENT OUT LEFTOVER BLADE SYNTAX AT THE START OF A LINE
+        transformed = []
+        for i, token in enumerate(tokens):
+            if token.kind == DIRECTIVE:
+                before = tokens[i - 1].text if i else ""
+                line_start = before.rfind("\n")
+                if not before[line_start + 1:].strip() and (line_start >= 0 or i <= 1) and (not i or tokens[i - 1].kind in (TEXT, SCRIPT)):
+                    token = BladeToken(COMMENT, f"<!-- {token.text} -->")
+            transformed.append(token)
+        return transformed
+
+    def split_outside_script(self, tokens: list[BladeToken]) -> tuple[list[BladeToken], list[BladeToken]]:
+        # SPLIT OFF A `<script>` AT THE END OF THE FILE, WHICH STAYS OUTSIDE OF THE `<template>`
+        end = len(tokens)
+        while end > 0 and self.is_blank(tokens[end - 1]):
+            end -= 1
+        if not end or tokens[end - 1].kind != TAG or not self.SCRIPT_END.fullmatch(tokens[end - 1].text):
+            return tokens, []
+        for start in range(end - 2, -1, -1):
+            if tokens[start].kind == TAG and self.SCRIPT_START.match(tokens[start].text):
+                return tokens[:start], tokens[start:]
+        return tokens, []
+
+    def update_js(self, code: str, imports: dict, add_js: list, indent: Optional[int] = None) -> str:
         if not (imports or add_js):
             return code
         if not indent or indent < 0:
             indent = 0
-        pattern = (
-            r"<script(\s+[\s\S]*)?>"
-            + Regex.all_except(r"<\/script\s*>", is_group=True)
-            + r"<\/script\s*>\s*(?=\s*$)"
-        )
         js_parts = {"new": [], "old": []}
         if imports:
             js_parts = {
@@ -540,261 +906,588 @@ class blade_to_vue:
             updated_js = "\n".join([f"{indent * ' '}{line}" for line in updated_js])
             return f"<script{f' {attrs}' if attrs else ''}>\n{updated_js}\n</script>"
 
-        if re.search(pattern, code, flags=re.DOTALL):
-            code = re.sub(pattern, add_new_script, code, flags=re.DOTALL)
-        else:
-            code += f'\n\n<script setup lang="ts">\n{"".join([f"{indent * ' '}{line}" for line in js_parts["new"]])}\n</script>'
+        try:
+            if self.SCRIPT_BLOCK.search(code, timeout=self.regex_timeout):
+                return self.SCRIPT_BLOCK.sub(add_new_script, code, timeout=self.regex_timeout)
+        except TimeoutError:
+            self.skip_rule("SCRIPT_BLOCK", code)
+        code += f'\n\n<script setup lang="ts">\n{"".join([f"{indent * ' '}{line}" for line in js_parts["new"]])}\n</script>'
         return code
 
-    def convert(self, code: str, indent: int = 2) -> str:
-        code = self.transform_concatenated(code)
-        self.add_php_funcs(code, JSON["php_as_js_functions"])
-        code = self.transform_script_lang_funcs(code)
+    def convert(self, code: str, indent: int = 2, reindent: bool = False) -> str:
+        js_imports: dict = {}  # THE COLLECTED JS BELONGS TO THIS CONVERSION ONLY, SO ONE CONVERTER CAN CONVERT MANY FILES
+        add_js: list = []
+        self.warnings = []
+        tokens = BladeLexer().tokenize(code)
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, self.transform_concatenated)
+        for token in tokens:
+            if token.kind in EXPRESSION_TOKENS:
+                self.add_php_funcs(token.text, js_imports, add_js)
+        tokens = self.visit(tokens, {SCRIPT}, lambda code: self.transform_script_lang_funcs(code, js_imports))
 
-        code = rx.sub(  # REPLACE `value->count()` WITH `value.length`
-            r"(?i)([\w.-]*\s*[)\]}]?)\s*->\s*count\s*" + R_BR, r"\1.length", code
-        )
-        code = rx.sub(  # REPLACE `count(  )` AND `strlen(  )` WITH `.length`
-            r"(?i)(?:count|strlen)\s*" + R_BR, r"\1.length", code
-        )
-        code = rx.sub(  # TRANSFORM `<tagname {{ $var.merge(['key_name' => 'values']) }} ...>` INTO `<tagname key_name="values" ...>`
-            r"<([\w.-]+)\s+\{\{\s*(\$[\w_]+)\s*->\s*merge\s*\(\s*"
-            + S_BR
-            + r"\s*\)\s*\}\}(.*?)/?>(\s*(?:\n|<[\w.-]+\s+|$))",
-            lambda m: f'<{m.group(1)} {' '.join(f'{a.strip(' \'"')}="{v.strip(' \'"')}"' for a, v in re.findall(r',?\s*(.*)\s*=>\s*(.*)', m.group(3)))} {m.group(4).strip()}>{m.group(5)}',
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.COUNT_METHOD.sub(  # REPLACE `value->count()` WITH `value.length`
+            r"\1.length", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.COUNT_FUNC.sub(  # REPLACE `count(  )` AND `strlen(  )` WITH `.length`
+            r"\1.length", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, {TAG}, lambda code: self.MERGED_ATTRIBUTES.sub(  # TRANSFORM `<tagname {{ $var.merge(['key_name' => 'values']) }} ...>` INTO `<tagname key_name="values" ...>`
+            lambda m: f'<{m.group(1)} {' '.join(f'{a.strip(' \'"')}="{v.strip(' \'"')}"' for a, v in self.MERGED_ATTRIBUTE.findall(m.group(3), timeout=self.regex_timeout))} {m.group(4).strip()}>{m.group(5)}',
             code,
-        )
-        code = re.sub(  # TRANSFORM ARROW CHAINS TO DOT CHAINS
-            r"([\w.-]*\s*[)\]}]?)\s*->\s*(?=\w\s*(\(.*?\))?)", r"\1.", code
-        )
+            timeout=self.regex_timeout,
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.ARROW_CHAIN.sub(  # TRANSFORM ARROW CHAINS TO DOT CHAINS
+            r"\1.", code, timeout=self.regex_timeout
+        ))
 
-        # code = self.transform_slots(code)
-        code = self.transform_tag_names(code, JSON["component_replacements"])
-        code = self.transform_func_names(code, JSON["function_replacements"])
-        code = self.transform_self_closing_tags(code)
-        code = self.transform_headings(code)
-        code = self.transform_loops(code)
-
-        code = re.sub(r"--}}", "-->", code)  # CORRECT COMMENT ENDS
-        code = re.sub(r"{{--", "<!--", code)  # CORRECT COMMENT STARTS
-        code = re.sub(r"<br\s*/>", "<br>", code)  # CORRECT LINE-BREAK TAGS
-        code = re.sub(  # CHANGE VARIABLES `$key`, `$index` TO `$idx`
-            r"\$(key|index)(?!\s*\()", "$idx", code
-        )
-        code = re.sub(  # CHANGE `loop.first` TO `idx == 0`
-            r"\s*loop\.first\s*", "idx == 0", code
-        )
-        code = re.sub(  # CHANGE `loop.last` TO `idx == ….length - 1`
-            r"\s*loop\.last\s*", "idx == ….length - 1", code
-        )
-        code = re.sub(  # CORRECT EQUALS
-            r"(?<=[^!<>=\s])\s*([!=])=\s*(?=[^=\s])", r" \1== ", code
-        )
-        code = re.sub(  # REMOVE EMPTY ATTRIBUTES
-            r'(?<![\w$])(\s*:?([\w-]+)\s*=\s*([\'"]))\3', "", code
-        )
-        code = rx.sub(  # REMOVE `init-errors` VARIABLES
-            r"\s*:\s*init-errors\s*=\s*" + QUOTES + r"(\s*(?:\n|$))", "", code
-        )
-        code = re.sub(  # REPLACE `{{ $slot }}` WITH `<slot />`
-            r"(?:<div\s*>\s*)?{{\s*\$(slot)\s*}}(?:\s*</div\s*>)?", r"<\1 />", code
-        )
-        code = re.sub(  # REPLACE `@php` SYNTAX WITH `<!--` COMMENT-START
-            r"(?i)(@php)", r"<!-- \1", code
-        )
-        code = re.sub(  # REPLACE `@endphp` SYNTAX WITH `-->` COMMENT-END
-            r"(?i)\s*@endphp", r" -->", code
-        )
-        code = rx.sub(  # REPLACE `import { route } from '...';` WITH `import { route } from '@/plugins/route';`
-            r"import\s*{\s*route\s*}\s*from\s*" + QUOTES + r"\s*;",
-            "import { route } from '@/plugins/route';",
-            code,
-        )
-        code = rx.sub(  # REPLACE `<div @if(true) attr>` SYNTAX WITH `<div :attr="true">` ATTRIBUTES
-            r"(?i)(<(?!/)[\w.-]+"
-            + Regex.all_except(r"<|>|@if")
-            + r")@if\s*"
-            + R_BR
-            + r"((?:\s+[\w-]+)?)("
-            + Regex.all_except(r"<|>")
-            + r">)",
-            lambda m: (
-                f'{m.group(1)}:{m.group(3).strip()}="{m.group(2).strip()}"{m.group(4)}'
-                if m.group(3).strip()
-                else m.group(0)
-            ),
-            code,
-            flags=re.DOTALL,
-        )
-        code = rx.sub(  # REPLACE `<div @empty(var) attr>` SYNTAX WITH `<div :attr="!var">` ATTRIBUTES
-            r"(?i)(<(?!/)[\w.-]+"
-            + Regex.all_except(r"<|>|@empty")
-            + r")@empty\s*"
-            + R_BR
-            + r"((?:\s+[\w-]+)?)("
-            + Regex.all_except(r"<|>")
-            + r">)",
-            lambda m: (
-                f'{m.group(1)}:{m.group(3).strip()}="!({m.group(2).strip()})"{m.group(4)}'
-                if m.group(3).strip()
-                else m.group(0)
-            ),
-            code,
-            flags=re.DOTALL,
-        )
-        code = rx.sub(  # REPLACE `<div @isset(var) attr>` SYNTAX WITH `<div :attr="(var) !== undefined">` ATTRIBUTES
-            r"(?i)(<(?!/)[\w.-]+"
-            + Regex.all_except(r"<|>|@isset")
-            + r")@isset\s*"
-            + R_BR
-            + r"((?:\s+[\w-]+)?)("
-            + Regex.all_except(r"<|>")
-            + r">)",
-            lambda m: (
-                f'{m.group(1)}:{m.group(3).strip()}="({m.group(2).strip()}) !== undefined"{m.group(4)}'
-                if m.group(3).strip()
-                else m.group(0)
-            ),
-            code,
-            flags=re.DOTALL,
-        )
-        code = rx.sub(  # REPLACE `<div @is_null(var) attr>` SYNTAX WITH `<div :attr="(var) === null">` ATTRIBUTES
-            r"(?i)(<(?!/)[\w.-]+"
-            + Regex.all_except(r"<|>|@is_null")
-            + r")@is_null\s*"
-            + R_BR
-            + r"((?:\s+[\w-]+)?)("
-            + Regex.all_except(r"<|>")
-            + r">)",
-            lambda m: (
-                f'{m.group(1)}:{m.group(3).strip()}="({m.group(2).strip()}) === null"{m.group(4)}'
-                if m.group(3).strip()
-                else m.group(0)
-            ),
-            code,
-            flags=re.DOTALL,
-        )
-        code = rx.sub(  # REMOVE `@end...` SYNTAX INSIDE TAG-ATTRIBUTES
-            r"(?i)(<(?!/)[\w.-]+"
-            + Regex.all_except(r"<|>|@end(?:[\w_]+)")
-            + r")@end([\w_]+)("
-            + Regex.all_except(r"<|>")
-            + r">)",
-            r"\1\3",
-            code,
-            flags=re.DOTALL,
-        )
-        code = rx.sub(  # REPLACE `@if(  )` SYNTAX WITH `<span v-if="  ">` TAGS
-            r"(?i)@if\s*" + R_BR, r'<span v-if="\1">', code
-        )
-        code = rx.sub(  # REPLACE `@empty(  )` SYNTAX WITH `<span v-if="!(  )">` TAGS
-            r"(?i)@empty\s*" + R_BR, r'<span v-if="!(\1)">', code
-        )
-        code = rx.sub(  # REPLACE `@isset(  )` SYNTAX WITH `<span v-if="(  ) !== undefined">` TAGS
-            r"(?i)@isset\s*" + R_BR, r'<span v-if="(\1) !== undefined">', code
-        )
-        code = rx.sub(  # REPLACE `@is_null(  )` SYNTAX WITH `<span v-if="(  ) === null">` TAGS
-            r"(?i)@is_null\s*" + R_BR, r'<span v-if="(\1) === null">', code
-        )
-        code = rx.sub(  # REPLACE `@elseif(  )` SYNTAX WITH `</span><span v-else-if="  ">` TAGS
-            r"(?i)@elseif\s*" + R_BR, r'</span><span v-else-if="\1">', code
-        )
-        code = re.sub(  # REPLACE `@else` SYNTAX WITH `</span><span v-else>` TAGS
-            r"(?i)@else(\s+)", r"</span><span v-else>\1", code
-        )
-        code = re.sub(  # REPLACE `@end...` SYNTAX WITH `</div>` or `</span>` END-TAGS
-            r"(?i)@end([\w_]+)",
-            lambda m: (
-                "</span>"
-                if m.group(1) in ("if", "isset", "elseif", "else")
-                else "</div>"
-            ),
-            code,
-        )
-        code = rx.sub(  # REPLACE `<div v-if="$slot"><slot name="...">{{ $slot }}</slot></div>` WITH `<slot />` OR `<slot name="..." />`
-            r'<([\w-]+)\s+v-if\s*=\s*"\s*\$?slot\s*"\s*>\s*<slot(?:\s+name\s*=\s*'
-            + QUOTES
-            + r")?\s*>\s*{{\s*\$?slot\s*}}\s*</slot\s*>\s*</\1\s*>",
-            lambda m: f'<slot{f' name="{m.group(3).strip()}"' if m.group(3).strip() else ''} />',
-            code,
-        )
-        code = rx.sub(  # REPLACE `__()` AND `$lang()` FUNCTIONS WITH `$t()` FUNCTION
-            L_FN + r"\s*\((.*?\))", r"$t(\1", code
-        )
-        code = re.sub(  # REPLACE `{!!  !!}` SYNTAX WITH `<div v-html="  "/>` TAGS
-            r"{!!\s*(.*?)\s*!!}", r'<div v-html="\1"/>', code
-        )
-        code = re.sub(  # REPLACE `:input="$input"` WITH `:input`
-            r':([\w-]+)\s*=\s*([\'"])\s*\$?\1\s*\2', r":\1", code
-        )
-        code = rx.sub(  # REPLACE LEFTOVER `attr="JS"` WITH `:attr="JS"` OR `:attr="string"` WITH `attr="string"`
-            r":?([\w-]+)\s*=\s*" + QUOTES,
+        tokens = self.visit(tokens, {TAG}, lambda code: self.transform_tag_names(code, js_imports))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, self.transform_func_names)
+        tokens = self.transform_self_closing_tags(tokens)
+        tokens = self.transform_headings(tokens)
+        tokens = self.visit(tokens, {DIRECTIVE}, self.transform_loops, into=TAG)
+
+        tokens = self.visit(tokens, {COMMENT}, lambda code: f"<!--{code[4:-4]}-->")  # CORRECT COMMENT STARTS AND ENDS
+        tokens = self.visit(tokens, {TAG}, lambda code: self.LINE_BREAK_TAG.sub("<br>", code))  # CORRECT LINE-BREAK TAGS
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.KEY_VARIABLE.sub(  # CHANGE VARIABLES `$key`, `$index` TO `$idx`
+            "$idx", code
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.LOOP_FIRST.sub(  # CHANGE `loop.first` TO `idx == 0`
+            "idx == 0", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.LOOP_LAST.sub(  # CHANGE `loop.last` TO `idx == ….length - 1`
+            "idx == ….length - 1", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.EQUALS.sub(  # CORRECT EQUALS
+            r" \1== ", code
+        ))
+        tokens = self.visit(tokens, {TAG}, lambda code: self.EMPTY_ATTRIBUTE.sub(  # REMOVE EMPTY ATTRIBUTES
+            "", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, {TAG}, lambda code: self.INIT_ERRORS_ATTRIBUTE.sub(  # REMOVE `init-errors` VARIABLES
+            "", code, timeout=self.regex_timeout
+        ))
+        tokens = self.transform_slot_echoes(tokens)
+        tokens = self.visit(tokens, {PHP}, lambda code: self.PHP_END.sub(  # REPLACE `@php` AND `@endphp` SYNTAX WITH `<!--` AND `-->`
+            r" -->", self.PHP_START.sub(r"<!-- \1", code), timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, {SCRIPT}, lambda code: self.ROUTE_IMPORT.sub(  # REPLACE `import { route } from '...';` WITH `import { route } from '@/plugins/route';`
+            "import { route } from '@/plugins/route';", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, {TAG}, self.transform_attribute_directives)
+        tokens = self.visit(tokens, {DIRECTIVE}, self.transform_directives, into=TAG)
+        tokens = self.transform_conditional_slots(tokens)
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.LANG_CALL.sub(  # REPLACE `__()` AND `$lang()` FUNCTIONS WITH `$t()` FUNCTION
+            r"$t(\1", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, {RAW_ECHO}, lambda code: self.RAW_ECHO_CONTENT.sub(  # REPLACE `{!!  !!}` SYNTAX WITH `<div v-html="  "/>` TAGS
+            r'<div v-html="\1"/>', code, timeout=self.regex_timeout
+        ), into=TAG)
+        tokens = self.visit(tokens, {TAG}, lambda code: self.SAME_NAME_BINDING.sub(  # REPLACE `:input="$input"` WITH `:input`
+            r":\1", code
+        ))
+        tokens = self.visit(tokens, {TAG}, lambda code: self.ATTRIBUTE.sub(  # REPLACE LEFTOVER `attr="JS"` WITH `:attr="JS"` OR `:attr="string"` WITH `attr="string"`
             lambda m: (
                 f':{m.group(1)}="{m.group(3).strip()}"'
                 if Code.is_js(m.group(3).strip())
                 else f'{m.group(1)}="{m.group(3).strip()}"'
             ),
             code,
-        )
-        code = rx.sub(  # REPLACE LEFTOVER `attr="{{  }}"` WITH `:attr="  "`
-            r':?([\w-]+)\s*=\s*([\'"])\s*\{' + C_BR + r"\}\s*\2",
+            timeout=self.regex_timeout,
+        ))
+        tokens = self.visit(tokens, {TAG}, lambda code: self.ECHO_ATTRIBUTE.sub(  # REPLACE LEFTOVER `attr="{{  }}"` WITH `:attr="  "`
             lambda m: f':{m.group(1)}="{m.group(3).strip()}"',
             code,
-        )
-        code = rx.sub(  # REPLACE `{{  }}`-CONCATENATED STRINGS WITH BACKTICK-STRINGS
-            r':?([\w-]+)\s*=\s*([\'"])(((?:\\.|(?:(?!\2).)+)*)\{'
-            + C_BR
-            + r"\}((?:\\.|(?:(?!\2).)+)*))\2",
+            timeout=self.regex_timeout,
+        ))
+        tokens = self.visit(tokens, {TAG}, lambda code: self.CONCATENATED_ATTRIBUTE.sub(  # REPLACE `{{  }}`-CONCATENATED STRINGS WITH BACKTICK-STRINGS
             lambda m: f':{m.group(1)}="`{m.group(3).replace('{{', '${').replace('}}', '}')}`"',
             code,
-        )
-        code = rx.sub(  # REMOVE `asset(  )` BRACKETS
-            r"(?i)asset\s*" + R_BR, r"\1", code
-        )
-        code = rx.sub(  # REMOVE `isset(  )` BRACKETS
-            r"(?i)isset\s*" + R_BR, r"(\1)", code
-        )
-        code = re.sub(  # COMMENT OUT LEFTOVER BLADE SYNTAX
-            r"(\n\s*)(@[\w_]+.*?)(\s*\n)", r"\1<!-- \2 -->\3", code
-        )
-        code = rx.sub(  # REMOVE `:` FROM VUE-ATTRIBUTES
-            r":v-([\w-]+)\s*=\s*" + QUOTES, r'v-\1="\3"', code
-        )
-        code = re.sub(  # REMOVE UNNECESSARY QUOTATION MARKS
-            r':?([\w-]+)\s*=\s*([\'"])\s*((?:\\\2|(?:(?!\2)[\'"]))+)((?:\\.|(?:(?!\2).)+)*)\3\s*\2',
+            timeout=self.regex_timeout,
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.ASSET_CALL.sub(  # REMOVE `asset(  )` BRACKETS
+            r"\1", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.ISSET_CALL.sub(  # REMOVE `isset(  )` BRACKETS
+            r"(\1)", code, timeout=self.regex_timeout
+        ))
+        tokens = self.comment_out_directives(tokens)
+        tokens = self.visit(tokens, {TAG}, lambda code: self.VUE_ATTRIBUTE.sub(  # REMOVE `:` FROM VUE-ATTRIBUTES
+            r'v-\1="\3"', code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, {TAG}, lambda code: self.QUOTED_ATTRIBUTE.sub(  # REMOVE UNNECESSARY QUOTATION MARKS
             lambda m: f'{m.group(1)}="{m.group(4).strip().replace("\\'", "'")}"',
             code,
-        )
-        code = rx.sub(  # REMOVE UNNECESSARY VARIABLE INPUTS
-            r"\$attributes\s*\[\s*" + QUOTES + r"\s*\]", r"\2", code
-        )
-        code = re.sub(  # REMOVE LEFTOVER `$` PREFIXES FROM VARS AND FUNCTIONS
-            r"\$(\w+)(?!\s*\()",
+            timeout=self.regex_timeout,
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.ATTRIBUTES_INPUT.sub(  # REMOVE UNNECESSARY VARIABLE INPUTS
+            r"\2", code, timeout=self.regex_timeout
+        ))
+        tokens = self.visit(tokens, EXPRESSION_TOKENS, lambda code: self.VARIABLE_PREFIX.sub(  # REMOVE LEFTOVER `$` PREFIXES FROM VARS AND FUNCTIONS
             lambda m: m.group(1) if not m.group(1) == "t" else m.group(0),
             code,
-        )
+        ))
 
-        outside_template_script_pattern = (r"(<script(?:\s+[\s\S]*)?>" + Regex.all_except(r"<\/script\s*>") + r"<\/script\s*>\s*)(?=\s*$)")
-        outside_template_script = "\n".join(rx.findall(outside_template_script_pattern, code, flags=re.DOTALL))
-        code = rx.sub(  # REMOVE OUTSIDE TEMPLATE SCRIPT
-            outside_template_script_pattern, "", code, flags=re.DOTALL
-        )
+        tokens, outside_template_tokens = self.split_outside_script(tokens)
+        code = "".join(token.text for token in tokens)
+        outside_template_script = "".join(token.text for token in outside_template_tokens)
         vue_content = f"<template>\n{Code.add_indent(code.strip(), Code.get_tab_spaces(code))}\n</template>\n\n{outside_template_script}"
-        if isinstance(ARGS.indent.values[0], int):
+        if reindent:
             vue_content = String.remove_consecutive_empty_lines(vue_content, max_consecutive=1)
-            Console.debug("Removed consecutive empty lines to [b|+]max_consecutive=1[_].", DEBUG, start="\n")
-            if not ARGS.indent.values[0] < 1:
+            Console.debug("Removed consecutive empty lines to [b|+]max_consecutive=1[_].", self.debug, start="\n")
+            if not indent < 1:
                 vue_content = Code.change_tab_size(vue_content, indent, remove_empty_lines=True)
-                Console.debug(f"Changed tab size to [b|+]{indent}[_] spaces and removed [b|+]all[_] empty lines.", DEBUG, start="\n")
-        return self.update_js(vue_content, JS_IMPORTS, ADD_JS)
+                Console.debug(f"Changed tab size to [b|+]{indent}[_] spaces and removed [b|+]all[_] empty lines.", self.debug, start="\n")
+        return self.update_js(vue_content, js_imports, add_js)
+
+
+class ConversionResult(NamedTuple):
+    source: str
+    target: str
+    status: str  # "converted", "unchanged", "skipped" OR "failed"
+    seconds: float
+    message: str = ""
+    cache_entry: Optional[tuple[str, str]] = None  # (SOURCE AND CONFIG HASH, OUTPUT HASH) IF THE TARGET IS UP TO DATE
+
+
+class ConversionCache:
+    # A CONTENT-ADDRESSED CACHE `<SOURCE HASH>:<CONFIG HASH>` -> `<OUTPUT HASH>` OF ALREADY CONVERTED FILES,
+    # SO FILES WHOSE SOURCE AND CONFIG DIDN'T CHANGE ARE SKIPPED WITHOUT CONVERTING THEM AGAIN
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, str] = {}
+        try:
+            with open(path, "r") as file:
+                cache = json.load(file)
+            if isinstance(cache, dict) and cache.get("version") == CACHE_VERSION and isinstance(cache.get("entries"), dict):
+                self.entries = cache["entries"]
+        except (OSError, ValueError):
+            pass  # NO OR AN UNREADABLE CACHE JUST MEANS EVERYTHING IS CONVERTED AGAIN
+
+    @staticmethod
+    def hash(content: str) -> str:
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def config_hash(json_config: dict, indent: int, reindent: bool) -> str:
+        # EVERYTHING THE OUTPUT DEPENDS ON BESIDES THE SOURCE, INCLUDING THE CONVERTER ITSELF
+        with open(os.path.abspath(__file__), "r", encoding="utf-8") as file:
+            converter_code = file.read()
+        return ConversionCache.hash(json.dumps({
+            "component_replacements": json_config["component_replacements"],
+            "php_as_js_functions": json_config["php_as_js_functions"],
+            "function_replacements": json_config["function_replacements"],
+            "indent": indent,
+            "reindent": reindent,
+            "converter": ConversionCache.hash(converter_code),
+        }, sort_keys=True))
+
+    def save(self, entries: list[tuple[str, str]], complete: bool = True) -> None:
+        # A COMPLETE RUN ONLY KEEPS THE ENTRIES OF ITS FILES, SO THE CACHE DOESN'T GROW WITH EVERY OLD VERSION OF A FILE
+        self.entries = dict(entries) if complete else {**self.entries, **dict(entries)}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(temp_path := f"{self.path}.tmp", "w") as file:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, file)
+        os.replace(temp_path, self.path)
+
+
+def get_target_path(source: str, directory: Optional[str] = None, output: Optional[str] = None) -> str:
+    target = File.rename_extension(source, ".vue", full_extension=True, camel_case_filename=True)
+    if directory and output:
+        target = os.path.join(output, os.path.relpath(target, directory))
+    return target
+
+
+def get_indent(args: ParsedArgs) -> tuple[int, bool]:
+    # THE INDENT TO CONVERT WITH AND WHETHER IT WAS GIVEN AS A NUMBER (ONLY THEN THE RESULT GETS RE-INDENTED)
+    indent_arg = (args.indent.values or [None])[0]
+    return int(indent_arg or 2), isinstance(indent_arg, int)
+
+
+def init_convert_worker(json_config: dict, debug: bool) -> None:
+    global CONVERTER  # ONE CONVERTER PER WORKER PROCESS, REUSED FOR ALL FILES IT GETS
+    CONVERTER = blade_to_vue(json_config, debug)
+
+
+def get_cached_result(source: str, target: str, config_hash: str, cache: ConversionCache, overwrite: str) -> Optional[ConversionResult]:
+    # THE RESULT OF A FILE WHOSE SOURCE WAS ALREADY CONVERTED WITH THE SAME CONFIG INTO THE EXISTING TARGET
+    start_time = time.perf_counter()
+    try:
+        with open(source, "r") as file:
+            cache_key = f"{ConversionCache.hash(file.read())}:{config_hash}"
+        if (cached_output := cache.entries.get(cache_key)) is None or not os.path.isfile(target):
+            return None
+        with open(target, "r") as existing_file:
+            if ConversionCache.hash(existing_file.read()) == cached_output:
+                return ConversionResult(source, target, "unchanged", time.perf_counter() - start_time, "cached", (cache_key, cached_output))
+        if overwrite == "skip-unchanged":
+            # THE SOURCE DIDN'T CHANGE SINCE ITS CONVERSION, SO THE TARGET WAS EDITED BY HAND AND IS KEPT
+            return ConversionResult(source, target, "skipped", time.perf_counter() - start_time, "target modified", (cache_key, cached_output))
+        return None
+    except OSError:
+        return None  # THE CONVERSION ITSELF WILL REPORT WHY THE FILE COULDN'T BE READ
+
+
+def convert_file(source: str, target: str, overwrite: str, indent: int, reindent: bool = False, config_hash: str = "") -> ConversionResult:
+    start_time = time.perf_counter()
+    try:
+        with open(source, "r") as file:
+            file_content = file.read()
+        existing_content = None
+        if os.path.isfile(target):
+            with open(target, "r") as existing_file:
+                existing_content = existing_file.read()
+        converted_content = CONVERTER.convert(file_content, indent, reindent)
+        # A CONVERSION WITH SKIPPED RULES ISN'T CACHED, SO IT'S TRIED AGAIN NEXT TIME
+        cache_entry = None if CONVERTER.warnings else (f"{ConversionCache.hash(file_content)}:{config_hash}", ConversionCache.hash(converted_content))
+        message = (f"{len(CONVERTER.warnings)} rules skipped, since they took too long" if len(CONVERTER.warnings) > 1 else "1 rule skipped, since it took too long") if CONVERTER.warnings else ""
+        if existing_content is not None:
+            if existing_content == converted_content:
+                return ConversionResult(source, target, "unchanged", time.perf_counter() - start_time, message, cache_entry)
+            if overwrite == "fail":
+                return ConversionResult(source, target, "failed", time.perf_counter() - start_time, "file already exists with other content")
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        with open(target, "w") as file:
+            file.write(converted_content)
+        return ConversionResult(source, target, "converted", time.perf_counter() - start_time, message, cache_entry)
+    except Exception as e:
+        return ConversionResult(source, target, "failed", time.perf_counter() - start_time, str(e) or type(e).__name__)
+
+
+def print_result(result: ConversionResult, directory: str, prefix: str = "") -> None:
+    FormatCodes.print(
+        f"  {prefix}[{STATUS_COLORS[result.status]}]({result.status:<9})  {result.seconds * 1000:>8,.1f} ms  "
+        f"{os.path.relpath(result.source, directory)}{f'  [dim]({result.message})' if result.message else ''}"
+    )
+
+
+def convert_directory(args: ParsedArgs, slowest: int = 5) -> None:
+    directory = os.path.abspath(str(args.directory.values[0]))
+    output = os.path.abspath(str(args.output.values[0])) if args.output.values else None
+    overwrite = str(args.overwrite.values[0])
+    if overwrite not in OVERWRITE_POLICIES:
+        Console.fail(f"Invalid overwrite policy [white]{overwrite}[_] (use one of: {', '.join(OVERWRITE_POLICIES)})", pause=DEBUG, start="\n", end="\n\n")
+    if not os.path.isdir(directory):
+        Console.fail(f"Path is not a directory: [white]{directory}", pause=DEBUG, start="\n", end="\n\n")
+    sources = sorted(str(path) for path in Path(directory).rglob("*.blade.php") if path.is_file())
+    if not sources:
+        Console.fail(f"No [white].blade.php[_] files found in: [white]{directory}", pause=DEBUG, start="\n", end="\n\n")
+    indent, reindent = get_indent(args)
+    cache = ConversionCache(os.path.join(output or directory, CACHE_FILE))
+    config_hash = ConversionCache.config_hash(JSON, indent, reindent)
+
+    results: list[ConversionResult] = []
+
+    def add_result(result: ConversionResult) -> None:
+        results.append(result)
+        print_result(result, directory)
+
+    start_time = time.perf_counter()
+    targets = {source: get_target_path(source, directory, output) for source in sources}
+    # FILES ALREADY CONVERTED WITH THE SAME SOURCE AND CONFIG ARE SKIPPED BEFORE ANY WORKER IS STARTED (UNLESS OVERWRITING ALL)
+    cached_results = [] if overwrite == "overwrite" else [
+        result for source in sources if (result := get_cached_result(source, targets[source], config_hash, cache, overwrite))
+    ]
+    cached_sources = {result.source for result in cached_results}
+    to_convert = [source for source in sources if source not in cached_sources]
+    workers = min(os.cpu_count() or 1, len(to_convert))
+
+    FormatCodes.print(
+        f"\nConverting [b]({len(to_convert):,}) of [b]({len(sources):,}) Blade files in [white]({directory})"
+        f"{f' with [b]({workers}) workers' if workers else ''}[dim]( ({len(cached_results):,} cached)):"
+    )
+    for result in cached_results:
+        add_result(result)
+    try:
+        if to_convert:
+            # EACH WORKER GETS THE ALREADY READ CONFIG, SINCE SPAWNED PROCESSES DON'T RUN `main()`
+            with ProcessPoolExecutor(workers, multiprocessing.get_context("spawn"), init_convert_worker, (JSON, DEBUG)) as pool:
+                futures = [pool.submit(convert_file, source, targets[source], overwrite, indent, reindent, config_hash) for source in to_convert]
+                try:
+                    for future in as_completed(futures):
+                        add_result(future.result())
+                except KeyboardInterrupt:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+    except KeyboardInterrupt:
+        cache.save([result.cache_entry for result in results if result.cache_entry], complete=False)
+        raise
+    cache.save([result.cache_entry for result in results if result.cache_entry])
+    total_time = time.perf_counter() - start_time
+
+    counts = {status: sum(result.status == status for result in results) for status in STATUS_COLORS}
+    FormatCodes.print(
+        f"\n[b](Summary:) [{STATUS_COLORS['converted']}|b]({counts['converted']:,}) converted[dim](,)"
+        f" [b]({counts['unchanged']:,}) unchanged[dim](,) [{STATUS_COLORS['skipped']}|b]({counts['skipped']:,}) skipped[dim](,) [{STATUS_COLORS['failed']}|b]({counts['failed']:,}) failed"
+        f" [dim](in) [b]({total_time:,.2f} s) [dim]((average {sum(result.seconds for result in results) / len(results) * 1000:,.1f} ms per file))"
+    )
+    if converted := sorted((result for result in results if result.status == "converted"), key=lambda result: -result.seconds)[:slowest]:
+        FormatCodes.print("[dim](Slowest conversions:)")
+        for result in converted:
+            FormatCodes.print(f"  {result.seconds * 1000:>8,.1f} ms  {os.path.relpath(result.source, directory)}")
+    if counts["failed"]:
+        FormatCodes.print(f"[{STATUS_COLORS['failed']}](Failed files:)")
+        for result in sorted((result for result in results if result.status == "failed"), key=lambda result: result.source):
+            FormatCodes.print(f"  {os.path.relpath(result.source, directory)}  [dim]({result.message})")
+    print()
+    Console.pause_exit(pause=DEBUG, exit=True, exit_code=1 if counts["failed"] else 0, reset_ansi=True)
+
+
+class InotifyWatcher:
+    # WATCHES A DIRECTORY TREE FOR WRITTEN FILES USING THE LINUX `inotify` API THROUGH `ctypes`
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, directory: str):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if (fd := self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)) < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = fd
+        self.directory = directory
+        self.watched_dirs: dict[int, str] = {}
+        self.add_tree(directory)
+
+    def add_tree(self, directory: str) -> set[str]:
+        # WATCH THE DIRECTORY AND ALL ITS SUBDIRECTORIES AND RETURN THE FILES ALREADY INSIDE THEM
+        files = set()
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        for dir_path, _, file_names in os.walk(directory):
+            if (wd := self.libc.inotify_add_watch(self.fd, os.fsencode(dir_path), mask)) >= 0:
+                self.watched_dirs[wd] = dir_path
+            files.update(os.path.join(dir_path, name) for name in file_names)
+        return files
+
+    def wait(self, timeout: Optional[float] = None) -> set[str]:
+        # BLOCK UNTIL FILES WERE WRITTEN (OR THE TIMEOUT PASSED) AND RETURN THEIR PATHS
+        changed: set[str] = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + self.EVENT_HEADER.size:offset + self.EVENT_HEADER.size + name_len].rstrip(b"\0"))
+            offset += self.EVENT_HEADER.size + name_len
+            if mask & self.IN_Q_OVERFLOW:  # EVENTS WERE LOST, SO EVERYTHING COULD HAVE CHANGED
+                changed.update(self.add_tree(self.directory))
+            elif mask & self.IN_IGNORED:
+                self.watched_dirs.pop(wd, None)
+            elif (dir_path := self.watched_dirs.get(wd)) is not None and name:
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        changed.update(self.add_tree(os.path.join(dir_path, name)))
+                elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                    changed.add(os.path.join(dir_path, name))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # FALLBACK WATCHER, WHICH COMPARES THE MODIFICATION TIMES AND SIZES OF ALL FILES IN A DIRECTORY TREE
+    def __init__(self, directory: str, interval: float = WATCH_POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.signatures = self.scan()
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        signatures = {}
+        for dir_path, _, file_names in os.walk(self.directory):
+            for name in file_names:
+                try:
+                    stat = os.stat(path := os.path.join(dir_path, name))
+                except OSError:
+                    continue
+                signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def wait(self, timeout: Optional[float] = None) -> set[str]:
+        # BLOCK UNTIL FILES WERE WRITTEN (OR THE TIMEOUT PASSED) AND RETURN THEIR PATHS
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+            signatures = self.scan()
+            changed = {path for path, signature in signatures.items() if self.signatures.get(path) != signature}
+            self.signatures = signatures
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        self.signatures.clear()
+
+
+def watch_directory(args: ParsedArgs) -> None:
+    directory = os.path.abspath(str(args.watch.values[0]))
+    output = os.path.abspath(str(args.output.values[0])) if args.output.values else None
+    overwrite = str(args.overwrite.values[0])
+    if overwrite not in OVERWRITE_POLICIES:
+        Console.fail(f"Invalid overwrite policy [white]{overwrite}[_] (use one of: {', '.join(OVERWRITE_POLICIES)})", pause=DEBUG, start="\n", end="\n\n")
+    if not os.path.isdir(directory):
+        Console.fail(f"Path is not a directory: [white]{directory}", pause=DEBUG, start="\n", end="\n\n")
+    indent, reindent = get_indent(args)
+    cache = ConversionCache(os.path.join(output or directory, CACHE_FILE))
+    config_hash = ConversionCache.config_hash(JSON, indent, reindent)
+    init_convert_worker(JSON, DEBUG)  # THE CONFIG IS ONLY READ ONCE AND THE SAME CONVERTER IS USED FOR ALL CHANGES
+    try:
+        watcher: InotifyWatcher | PollingWatcher = InotifyWatcher(directory)
+        watch_mode = "inotify"
+    except (OSError, AttributeError):  # NOT ON LINUX OR NO `inotify` IN THE C LIBRARY
+        watcher = PollingWatcher(directory)
+        watch_mode = f"polling every {WATCH_POLL_INTERVAL:g} s"
+    changes: queue.Queue[Optional[list[str]]] = queue.Queue()
+
+    def convert_changes() -> None:
+        # BACKGROUND WORKER, SO NEW CHANGES ARE STILL COLLECTED WHILE CONVERTING
+        while (sources := changes.get()) is not None:
+            cache_entries = []
+            for source in sources:
+                target = get_target_path(source, directory, output)
+                result = get_cached_result(source, target, config_hash, cache, overwrite) or convert_file(source, target, overwrite, indent, reindent, config_hash)
+                print_result(result, directory, prefix=f"[dim]({time.strftime('%H:%M:%S')})  ")
+                if result.cache_entry:
+                    cache_entries.append(result.cache_entry)
+            cache.save(cache_entries, complete=False)
+
+    worker = threading.Thread(target=convert_changes, name="x-convert-watch", daemon=True)
+    worker.start()
+    FormatCodes.print(f"\nWatching [white]({directory}) for changed Blade files [dim](({watch_mode}, Ctrl+C to stop)):")
+    # FIRST BRING ALL FILES UP TO DATE (UNCHANGED FILES ARE SKIPPED THROUGH THE CACHE)
+    changes.put(sorted(str(path) for path in Path(directory).rglob("*.blade.php") if path.is_file()))
+    try:
+        while True:
+            changed = watcher.wait()
+            while more_changed := watcher.wait(WATCH_DEBOUNCE):  # WAIT UNTIL THE BURST OF CHANGES IS OVER
+                changed |= more_changed
+            if sources := sorted(path for path in changed if path.endswith(".blade.php") and os.path.isfile(path)):
+                changes.put(sources)
+    finally:
+        changes.put(None)
+        watcher.close()
+        worker.join(timeout=5)
+
+
+def run_fuzz(args: ParsedArgs, sizes: tuple[int, ...] = FUZZ_SIZES, timeout: float = 1.0) -> None:
+    # HUNT FOR PATTERNS WHOSE TIME GROWS FASTER THAN LINEARLY WITH THE INPUT SIZE, ON RANDOM MALFORMED TEMPLATE PIECES
+    rounds = int((args.fuzz.values or [None])[0] or 100)
+    patterns: dict[str, re.Pattern | rx.Pattern] = {
+        name: value for name, value in vars(blade_to_vue).items() if isinstance(value, (re.Pattern, rx.Pattern))
+    }
+    patterns.update({f"ATTRIBUTE_DIRECTIVES[{name}]": pattern for name, pattern in blade_to_vue.ATTRIBUTE_DIRECTIVES.items()})
+    # STDLIB PATTERNS CAN'T TIME OUT, SO THEY ARE TIMED WITH THE SAME PATTERN COMPILED BY `rx`
+    guarded = {name: pattern if isinstance(pattern, rx.Pattern) else rx.compile(pattern.pattern, pattern.flags) for name, pattern in patterns.items()}
+
+    def time_pattern(pattern: rx.Pattern, text: str, repeats: int = 2) -> float:
+        timings = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            try:
+                pattern.sub("", text, timeout=timeout)
+            except TimeoutError:
+                return float("inf")
+            timings.append(time.perf_counter() - start_time)
+        return min(timings)
+
+    FormatCodes.print(f"\nFuzzing [b]({len(patterns)}) patterns with [b]({rounds:,}) random inputs of [b]({sizes[0]:,}) to [b]({sizes[-1]:,}) characters:")
+    worst: dict[str, tuple[float, float, int, str]] = {}  # PATTERN NAME -> (GROWTH EXPONENT, TIME AT THE LARGEST SIZE, ROUND, INPUT START)
+    progress = ProgressBar()
+    try:
+        for fuzz_round in range(rounds):
+            progress.show_progress(fuzz_round, rounds, f"round {fuzz_round + 1:,}")
+            random_gen = random.Random(fuzz_round)
+            # EVERY OTHER INPUT REPEATS A SHORT MOTIF, SINCE REPETITIONS ARE WHAT MAKES BACKTRACKING EXPLODE
+            if fuzz_round % 2:
+                prefix = "".join(random_gen.choices(FUZZ_FRAGMENTS, k=random_gen.randint(0, 3)))
+                motif = "".join(random_gen.choices(FUZZ_FRAGMENTS, k=random_gen.randint(1, 4)))
+                text = prefix + motif * (sizes[-1] // len(motif) + 1)
+            else:
+                text = "".join(random_gen.choices(FUZZ_FRAGMENTS, k=sizes[-1]))
+            for name, pattern in guarded.items():
+                timings = []
+                for size in sizes:
+                    timings.append(time_pattern(pattern, text[:size]))
+                    if timings[-1] == float("inf"):
+                        break
+                if timings[-1] == float("inf"):
+                    exponent = float("inf")
+                else:  # HOW THE TIME GROWS FROM THE SMALLEST TO THE LARGEST SIZE (1 = LINEAR, 2 = QUADRATIC, ...)
+                    exponent = math.log(max(timings[-1], 1e-5) / max(timings[0], 1e-5)) / math.log(sizes[-1] / sizes[0])
+                if name not in worst or (exponent, timings[-1]) > worst[name][:2]:
+                    worst[name] = (exponent, timings[-1], fuzz_round, text[:60])
+    finally:
+        progress.hide_progress()
+
+    FormatCodes.print(f"\n[b](Super-linear patterns) [dim]((growth exponent of the time from {sizes[0]:,} to {sizes[-1]:,} characters)):")
+    suspicious = sorted(  # FAST PATTERNS ARE LEFT OUT, SINCE THEIR TIMINGS ARE MOSTLY NOISE
+        ((name, *values) for name, values in worst.items() if values[0] > 1.5 and values[1] >= 0.005),
+        key=lambda row: (-row[1], -row[2]),
+    )
+    for name, exponent, seconds, fuzz_round, text in suspicious:
+        FormatCodes.print(
+            f"  [b]({name:<28})  "
+            + (f"[#FF5252](timed out after {timeout:g} s)" if exponent == float("inf") else f"[#FF9E6A](~n^{exponent:.1f})  {seconds * 1000:>9,.1f} ms")
+            + f"  [dim]round {fuzz_round:,}: {FormatCodes.escape(repr(text))}[_]"
+        )
+    if not suspicious:
+        FormatCodes.print("  [#41B883](None found.)")
+    print()
+
+
+def run_benchmark(args: ParsedArgs, rounds: int = 3) -> None:
+    get_json(args)
+    file_path = (args.filepath.values or [None])[0] or os.path.join(FileSys.script_dir, "tests", "directives.blade.php")
+    with open(file_path, "r") as file:
+        template = file.read().rstrip("\n")
+    template_lines = template.count("\n") + 1
+    indent, reindent = get_indent(args)
+    converter = blade_to_vue(JSON, DEBUG)
+
+    def best_time(func) -> float:
+        timings = []
+        for _ in range(rounds):
+            start_time = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start_time)
+        return min(timings)
+
+    FormatCodes.print(f"\nBenchmarking [b]({os.path.basename(file_path)}) repeated up to [b]({BENCHMARK_LINES[-1]:,}) lines:")
+    for lines in BENCHMARK_LINES:
+        code = "\n".join([template] * max(1, round(lines / template_lines)))
+        lines = code.count("\n") + 1
+        lex_time = best_time(lambda: BladeLexer().tokenize(code))
+        convert_time = best_time(lambda: converter.convert(code, indent, reindent))
+        FormatCodes.print(
+            f"  [b]({lines:>7,} lines)  lex [br:white]({lex_time * 1000:>7,.1f} ms)"
+            f"  convert [br:white]({convert_time * 1000:>9,.1f} ms)  [dim]({convert_time / lines * 1_000_000:>6,.1f} µs/line)"
+        )
+    # THE SAME CONVERTER ON MANY SMALL FILES, LIKE IN `--dir` MODE, SHOWS THE FIXED COST PER FILE
+    files_time = best_time(lambda: [converter.convert(template, indent, reindent) for _ in range(BENCHMARK_FILES)])
+    FormatCodes.print(
+        f"  [b]({BENCHMARK_FILES:>7,} files)  {template_lines:,} lines each"
+        f"  convert [br:white]({files_time * 1000:>9,.1f} ms)  [dim]({files_time / BENCHMARK_FILES * 1000:>6,.2f} ms/file)"
+    )
+    print()
 
 
 def main(args: ParsedArgs):
     get_json(args)
     if DEBUG and not Data.is_equal(_JSON, DEFAULT_JSON, ignore_paths="is_in_env_vars"):
         Console.debug(f"{JSON_FILE} does not match the default json.")
-    add_to_env_vars()
+    add_to_env_vars(ask=not is_batch_mode(args))
     args = get_missing_args(args)
+    if args.directory.values:
+        convert_directory(args)
+    if args.watch.values:
+        watch_directory(args)
     if args.filepath.values[0] in (None, ""):
         Console.fail("No filepath was provided.", pause=DEBUG, end="\n\n")
     args.filepath.values[0] = str(FileSys.extend_path(str(args.filepath.values[0]), raise_error=True, fuzzy_match=True))
@@ -803,11 +1496,13 @@ def main(args: ParsedArgs):
 
     with open(args.filepath.values[0] or "", "r") as file:
         file_content = file.read()
-    converter = blade_to_vue()
-    converted_content = (converter.convert(file_content, int(args.indent.values[0] or 2)) if args.blade_vue.exists else None)
+    converter = blade_to_vue(JSON, DEBUG)
+    converted_content = (converter.convert(file_content, *get_indent(args)) if args.blade_vue.exists else None)
+    for warning in converter.warnings:
+        Console.warn(warning, exit=False, start="\n")
 
     if converted_content:
-        new_file_path = File.rename_extension(args.filepath.values[0] or "", ".vue", camel_case_filename=True)
+        new_file_path = get_target_path(args.filepath.values[0] or "")
         if os.path.exists(new_file_path):
             with open(new_file_path, "r") as existing_file:
                 existing_content = existing_file.read()
@@ -828,16 +1523,25 @@ def main(args: ParsedArgs):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     DEBUG = ARGS.debug.exists
     if DEBUG:
         if ARGS.help.exists:
             show_help()
+        elif ARGS.benchmark.exists:
+            run_benchmark(ARGS)
+        elif ARGS.fuzz.exists:
+            run_fuzz(ARGS)
         else:
             main(ARGS)
     else:
         try:
             if ARGS.help.exists:
                 show_help()
+            elif ARGS.benchmark.exists:
+                run_benchmark(ARGS)
+            elif ARGS.fuzz.exists:
+                run_fuzz(ARGS)
             else:
                 main(ARGS)
         except FileNotFoundError: